@@ -1,9 +1,29 @@
 import streamlit as st
-import pandas as pd
-from collections import Counter
-import random
-import itertools
 import numpy as np 
+import json
+import os
+import time
+from dataclasses import replace
+
+from keno.analysis import RoundParseError, coldest_numbers, select_top_numbers
+from keno.backtest import random_hit_distribution, walk_forward
+from keno.batch import generate_variants_batch
+from keno.cache import AnalysisCache, content_key
+from keno.constrained import VariantConstraints, generate_constrained_variants
+from keno.context import StrategyContext
+from keno.export import EXPORT_FORMATS, available_formats, export_bytes
+from keno.generation import covers_feasible_space, feasible_space, format_export_lines, generate_variants, generate_variants_exhaustive, should_enumerate
+from keno.hits import history_hit_histograms, rank_by_hits
+from keno.incremental import IncrementalAnalysis
+from keno.jobs import GenerationJob
+from keno.metrics import GenerationMetrics, RunProfile
+from keno.stats import compute_variant_stats
+from keno.parallel import generate_variants_parallel
+from keno.scheduler import AdaptiveScheduler
+from keno.store import STORE_EXTENSION, open_history, write_history
+from keno.strategies import ALL_STRATEGIES
+from keno.variants import VariantStore
+from keno.wheel import generate_covering_variants
 
 st.set_page_config(page_title="Generator Variante Keno Avansat", page_icon="🎯", layout="wide")
 
@@ -19,413 +39,88 @@ if "variants" not in st.session_state:
     st.session_state.variants = []
 if "top_numbers" not in st.session_state:
     st.session_state.top_numbers = []
-if "frequency" not in st.session_state:
-    st.session_state.frequency = {}
-if "historic_rounds" not in st.session_state:
-    st.session_state.historic_rounds = []
+if "analysis" not in st.session_state:
+    st.session_state.analysis = None
+if "incremental" not in st.session_state:
+    st.session_state.incremental = None
 if "max_number" not in st.session_state:
     st.session_state.max_number = 80
-if "pair_frequency" not in st.session_state:
-    st.session_state.pair_frequency = {}
-if "triplet_frequency" not in st.session_state:
-    st.session_state.triplet_frequency = {}
 if "selected_strategies" not in st.session_state:
     st.session_state.selected_strategies = []
 if "history_depth" not in st.session_state: 
     st.session_state.history_depth = 50
-if "avg_reps" not in st.session_state:
-    st.session_state.avg_reps = 0
 if "generation_ran" not in st.session_state: 
     st.session_state.generation_ran = False 
 if "process_ran" not in st.session_state:
     st.session_state.process_ran = False
 if "top_stats_count" not in st.session_state: 
     st.session_state.top_stats_count = 10 
-
-# --- Funcții de suport ---
-def analyze_pairs_triplets(rounds, k_size):
-    pair_counts = Counter()
-    triplet_counts = Counter()
-    for round_nums in rounds:
-        sorted_nums = sorted(round_nums)
-        for pair in itertools.combinations(sorted_nums, 2):
-            pair_counts[tuple(sorted(pair))] += 1
-        if k_size >= 3:
-            for triplet in itertools.combinations(sorted_nums, 3):
-                triplet_counts[tuple(sorted(triplet))] += 1
-    sorted_pairs = dict(sorted(pair_counts.items(), key=lambda x: x[1], reverse=True))
-    sorted_triplets = dict(sorted(triplet_counts.items(), key=lambda x: x[1], reverse=True))
-    return sorted_pairs, sorted_triplets
-
-def analyze_cold_streak(rounds, max_num):
-    cold_streak = {}
-    all_nums = set(range(1, max_num + 1))
-    for num in all_nums:
-        age = 0
-        for round_nums in reversed(rounds):
-            if num in round_nums: 
-                break
-            age += 1
-        cold_streak[num] = age
-    return dict(sorted(cold_streak.items(), key=lambda x: x[1], reverse=True))
-
-def analyze_repetitions(rounds):
-    repetitions = []
-    if len(rounds) < 2: 
-        return 0
-    for i in range(1, len(rounds)):
-        prev_round = set(rounds[i-1])
-        current_round = set(rounds[i])
-        repetitions.append(len(prev_round.intersection(current_round)))
-    if not repetitions: 
-        return 0
-    return round(np.median(repetitions))
-
-def proceseaza_runde(lines, variant_size):
-    all_numbers = []
-    rounds_data = []
-    for line in lines:
-        try:
-            numbers = [int(x.strip()) for x in line.split(",") if x.strip()]
-            if any(n > st.session_state.max_number or n < 1 for n in numbers):
-                st.error(f"Eroare: Runda conține numere în afara intervalului 1 la {st.session_state.max_number}.")
-                return None, None, None
-            if numbers:
-                all_numbers.extend(numbers)
-                rounds_data.append(numbers)
-        except ValueError:
-            st.error(f"Eroare la procesarea liniei: '{line}'. Asigură-te că sunt doar numere întregi valide separate prin virgulă.")
-            return None, None, None
-    if not rounds_data: 
-        return None, None, None
-
-    frequency = Counter(all_numbers)
-    sorted_freq = sorted(frequency.items(), key=lambda x: x[1], reverse=True)
-    st.session_state.frequency = dict(sorted_freq)
-    st.session_state.historic_rounds = rounds_data
-    st.session_state.pair_frequency, st.session_state.triplet_frequency = analyze_pairs_triplets(rounds_data, variant_size)
-    st.session_state.avg_reps = analyze_repetitions(rounds_data)
-    return frequency, sorted_freq, all_numbers
-
-def weighted_sample_unique(population, weights, k):
-    sample = []
-    available = list(population)
-    current_weights = list(weights)
-
-    for _ in range(k):
-        if len(available) == 0: 
-            break
-        if sum(current_weights) <= 0:
-            sample.extend(random.sample(available, k - len(sample)))
-            break
-            
-        chosen = random.choices(available, weights=current_weights, k=1)[0]
-        sample.append(chosen)
-
-        idx = available.index(chosen)
-        available.pop(idx)
-        current_weights.pop(idx)
-        
-    return sample
-
-def is_valid_variant(variant, max_num):
-    variant_set = set(variant)
-    if len(variant_set) != len(variant): 
-        return False
-    return True
-
-
-# --- Functie pentru generarea variantei pe baza strategiei (Logica Completa) ---
-def generate_variant_by_strategy(strategy_key, top_nums, variant_size, exclude_numbers, max_num, cold_data, top_pairs, top_triplets, cold_candidates, historic_rounds, avg_reps, use_triplets):
-    if len(top_nums) < variant_size: 
-        return []
-    
-    all_numbers_with_freq = st.session_state.frequency
-    sorted_freq_keys = list(st.session_state.frequency.keys())
-    variant = []
-    
-    # Strategy: Standard (Uniform Random)
-    if strategy_key == "standard":
-        variant = random.sample(top_nums, variant_size)
-    
-    # Strategy: Weighted Frequency
-    elif strategy_key == "weighted_frequency":
-        weights = [all_numbers_with_freq.get(n, 1) for n in top_nums]
-        variant = weighted_sample_unique(top_nums, weights, variant_size)
-    
-    # Strategy: Hot Numbers (3 from top 10 + rest weighted)
-    elif strategy_key == "hot_numbers":
-        hot_pool = top_nums[:min(10, len(top_nums))]
-        num_hot = min(3, variant_size, len(hot_pool))
-        variant.extend(random.sample(hot_pool, num_hot))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                weights = [all_numbers_with_freq.get(n, 1) for n in rest_pool]
-                variant.extend(weighted_sample_unique(rest_pool, weights, remaining))
-    
-    # Strategy: Cold-Hot Hybrid
-    elif strategy_key == "cold_hot_hybrid":
-        num_hot = variant_size // 2
-        num_cold = variant_size - num_hot
-        
-        hot_pool = top_nums[:len(top_nums)//2]
-        cold_pool = [n for n in top_nums if n not in hot_pool]
-        
-        if hot_pool:
-            variant.extend(random.sample(hot_pool, min(num_hot, len(hot_pool))))
-        if cold_pool and num_cold > 0:
-            variant.extend(random.sample(cold_pool, min(num_cold, len(cold_pool))))
-    
-    # Strategy: Golden Pairs/Triplets
-    elif strategy_key == "golden_pairs":
-        base_used = set()
-        if use_triplets and top_triplets and variant_size >= 3:
-            top_combo = list(top_triplets.keys())[0] if top_triplets else None
-            if top_combo:
-                variant.extend(top_combo)
-                base_used.update(top_combo)
-        elif top_pairs:
-            top_pair = list(top_pairs.keys())[0] if top_pairs else None
-            if top_pair:
-                variant.extend(top_pair)
-                base_used.update(top_pair)
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in base_used]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Parity Balance
-    elif strategy_key == "parity_balance":
-        even_nums = [n for n in top_nums if n % 2 == 0]
-        odd_nums = [n for n in top_nums if n % 2 == 1]
-        
-        num_even = variant_size // 2
-        num_odd = variant_size - num_even
-        
-        if even_nums:
-            variant.extend(random.sample(even_nums, min(num_even, len(even_nums))))
-        if odd_nums:
-            variant.extend(random.sample(odd_nums, min(num_odd, len(odd_nums))))
-    
-    # Strategy: Quadrant Force
-    elif strategy_key == "quadrant_force":
-        q1 = [n for n in top_nums if n <= max_num // 4]
-        q2 = [n for n in top_nums if max_num // 4 < n <= max_num // 2]
-        q3 = [n for n in top_nums if max_num // 2 < n <= 3 * max_num // 4]
-        q4 = [n for n in top_nums if n > 3 * max_num // 4]
-        
-        quadrants = [q for q in [q1, q2, q3, q4] if q]
-        nums_per_quad = max(1, variant_size // len(quadrants)) if quadrants else 1
-        
-        for q in quadrants:
-            if len(variant) < variant_size and q:
-                variant.extend(random.sample(q, min(nums_per_quad, len(q), variant_size - len(variant))))
-    
-    # Strategy: Return Age
-    elif strategy_key == "return_age":
-        aged_nums = sorted(cold_data.items(), key=lambda x: x[1], reverse=True)
-        aged_pool = [n for n, age in aged_nums if n in top_nums and age > 5][:variant_size]
-        
-        if aged_pool:
-            num_aged = min(variant_size // 2, len(aged_pool))
-            variant.extend(random.sample(aged_pool, num_aged))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Consecutive Pair
-    elif strategy_key == "consecutive_pair":
-        consecutive_found = False
-        for i, n in enumerate(top_nums[:-1]):
-            if top_nums[i+1] == n + 1:
-                variant.extend([n, n+1])
-                consecutive_found = True
-                break
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Frequency Neighbors
-    elif strategy_key == "frequency_neighbors":
-        if sorted_freq_keys:
-            seed = random.choice(sorted_freq_keys[:20])
-            variant.append(seed)
-            
-            neighbors = [n for n in top_nums if abs(n - seed) <= 5 and n != seed]
-            if neighbors:
-                num_neighbors = min(variant_size // 2, len(neighbors))
-                variant.extend(random.sample(neighbors, num_neighbors))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Cold Booster
-    elif strategy_key == "cold_booster":
-        if cold_candidates:
-            num_cold = min(variant_size // 3, len(cold_candidates))
-            variant.extend(random.sample(cold_candidates, num_cold))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Average Sum Weighted
-    elif strategy_key == "average_sum_weighted":
-        target_sum = (max_num * variant_size) // 2
-        weights = [1.0 / (1 + abs(n - target_sum / variant_size)) for n in top_nums]
-        variant = weighted_sample_unique(top_nums, weights, variant_size)
-    
-    # Strategy: History Adherence
-    elif strategy_key == "history_adherence":
-        recent_rounds = historic_rounds[-st.session_state.history_depth:] if historic_rounds else []
-        recent_nums = []
-        for r in recent_rounds:
-            recent_nums.extend(r)
-        recent_freq = Counter(recent_nums)
-        
-        pool_with_recent = [n for n in top_nums if n in recent_freq]
-        if pool_with_recent:
-            weights = [recent_freq.get(n, 1) for n in pool_with_recent]
-            variant = weighted_sample_unique(pool_with_recent, weights, min(variant_size, len(pool_with_recent)))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Mix Strategy
-    elif strategy_key == "mix_strategy":
-        available_strategies = ["hot_numbers", "cold_hot_hybrid", "weighted_frequency", "parity_balance"]
-        chosen_strat = random.choice(available_strategies)
-        return generate_variant_by_strategy(chosen_strat, top_nums, variant_size, exclude_numbers, max_num, cold_data, top_pairs, top_triplets, cold_candidates, historic_rounds, avg_reps, use_triplets)
-    
-    # Strategy: Hot/Cold Ratio 70/30
-    elif strategy_key == "hot_cold_ratio":
-        num_hot = int(variant_size * 0.7)
-        num_cold = variant_size - num_hot
-        
-        hot_pool = top_nums[:len(top_nums)//2]
-        cold_pool = [n for n in top_nums if n not in hot_pool]
-        
-        if hot_pool:
-            variant.extend(random.sample(hot_pool, min(num_hot, len(hot_pool))))
-        if cold_pool and num_cold > 0:
-            variant.extend(random.sample(cold_pool, min(num_cold, len(cold_pool))))
-    
-    # Strategy: Low Numbers Gravitation
-    elif strategy_key == "low_numbers_gravitation":
-        low_pool = [n for n in top_nums if n <= max_num // 3]
-        num_low = min(variant_size // 2, len(low_pool))
-        
-        if low_pool:
-            variant.extend(random.sample(low_pool, num_low))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Quadrant Mirroring
-    elif strategy_key == "quadrant_mirroring":
-        if historic_rounds:
-            last_round = historic_rounds[-1]
-            last_quadrants = []
-            for n in last_round:
-                if n <= max_num // 4:
-                    last_quadrants.append(1)
-                elif n <= max_num // 2:
-                    last_quadrants.append(2)
-                elif n <= 3 * max_num // 4:
-                    last_quadrants.append(3)
-                else:
-                    last_quadrants.append(4)
-            
-            for q in set(last_quadrants):
-                if q == 1:
-                    pool = [n for n in top_nums if n <= max_num // 4 and n not in variant]
-                elif q == 2:
-                    pool = [n for n in top_nums if max_num // 4 < n <= max_num // 2 and n not in variant]
-                elif q == 3:
-                    pool = [n for n in top_nums if max_num // 2 < n <= 3 * max_num // 4 and n not in variant]
-                else:
-                    pool = [n for n in top_nums if n > 3 * max_num // 4 and n not in variant]
-                
-                if pool and len(variant) < variant_size:
-                    variant.append(random.choice(pool))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Forced Repetitions
-    elif strategy_key == "forced_repetitions":
-        if historic_rounds and avg_reps > 0:
-            last_round = set(historic_rounds[-1])
-            repeat_pool = [n for n in last_round if n in top_nums]
-            
-            num_repeat = min(avg_reps, len(repeat_pool), variant_size)
-            if repeat_pool:
-                variant.extend(random.sample(repeat_pool, num_repeat))
-        
-        remaining = variant_size - len(variant)
-        if remaining > 0:
-            rest_pool = [n for n in top_nums if n not in variant]
-            if rest_pool:
-                variant.extend(random.sample(rest_pool, min(remaining, len(rest_pool))))
-    
-    # Strategy: Stratified Mix (doar pentru 4/4)
-    elif strategy_key == "stratified_mix":
-        if variant_size != 4 or len(sorted_freq_keys) < 25:
-            weights = [all_numbers_with_freq.get(n, 1) for n in top_nums]
-            variant = weighted_sample_unique(top_nums, weights, variant_size)
-        else:
-            pool_15 = set(sorted_freq_keys[:15])
-            pool_16_20 = set(sorted_freq_keys[15:20])
-            pool_21_25 = set(sorted_freq_keys[20:25])
-            all_top_n_set = set(top_nums)
-            pool_rest = all_top_n_set - (pool_15 | pool_16_20 | pool_21_25)
-            
-            if pool_15 and pool_16_20 and pool_21_25 and pool_rest:
-                variant.append(random.choice(list(pool_15)))
-                variant.append(random.choice(list(pool_16_20)))
-                variant.append(random.choice(list(pool_21_25)))
-                variant.append(random.choice(list(pool_rest)))
-            else:
-                weights = [all_numbers_with_freq.get(n, 1) for n in top_nums]
-                variant = weighted_sample_unique(top_nums, weights, variant_size)
-    
-    # Default fallback
-    else:
-        variant = random.sample(top_nums, variant_size)
-    
-    # Ensure unique and correct size
-    variant = list(set(variant))
-    if len(variant) < variant_size:
-        rest_pool = [n for n in top_nums if n not in variant]
-        if rest_pool:
-            variant.extend(random.sample(rest_pool, min(variant_size - len(variant), len(rest_pool))))
-    
-    return variant[:variant_size]
+if "history_hits" not in st.session_state:
+    st.session_state.history_hits = None
+if "variant_stats" not in st.session_state:
+    st.session_state.variant_stats = None
+if "exports" not in st.session_state:
+    st.session_state.exports = {}
+if "generation_metrics" not in st.session_state:
+    st.session_state.generation_metrics = None
+if "generation_profile" not in st.session_state:
+    st.session_state.generation_profile = None
+if "generation_partial" not in st.session_state:
+    st.session_state.generation_partial = None
+if "generation_job" not in st.session_state:
+    st.session_state.generation_job = None
+if "generation_request" not in st.session_state:
+    st.session_state.generation_request = None
+if "generation_messages" not in st.session_state:
+    st.session_state.generation_messages = []
+if "memo" not in st.session_state:
+    st.session_state.memo = {}
+if "analysis_version" not in st.session_state:
+    st.session_state.analysis_version = 0
+if "variants_version" not in st.session_state:
+    st.session_state.variants_version = 0
+
+# --- Cache partajat între sesiuni: parse -> analiză, după hash-ul conținutului ---
+@st.cache_resource
+def get_analysis_cache():
+    budget_mb = int(os.environ.get("KENO_CACHE_MB", "256"))
+    return AnalysisCache(budget_mb * 1024 * 1024)
+
+
+# --- Rerulări parțiale și memoizare per secțiune ---
+# Un fragment se re-execută singur când i se schimbă propriile widget-uri, fără restul
+# paginii; pe versiunile Streamlit fără fragmente, secțiunile rulează ca funcții obișnuite.
+poll_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+fragment = poll_fragment or (lambda fn: fn)
+
+# Cât de des se reîmprospătează progresul unui job de generare în fundal
+JOB_POLL_SECONDS = 1.0
+# Câte variante parțiale se afișează în timpul unui job
+JOB_PREVIEW_ROWS = 20
+
+
+def memo(name, key, build):
+    # Rezultatul unei secțiuni se recalculează doar când i se schimbă intrările (`key`);
+    # analysis_version / variants_version identifică analiza și setul de variante curente
+    cached = st.session_state.memo.get(name)
+    if cached is None or cached[0] != key:
+        cached = (key, build())
+        st.session_state.memo[name] = cached
+    return cached[1]
+
+
+# --- Istoric binar pe disc (opțional): rundele sunt citite prin mmap, nu ținute în sesiune ---
+def persist_history(analysis, cache_key):
+    store_dir = os.environ.get("KENO_STORE_DIR")
+    if not store_dir:
+        return analysis
+    digest, max_number, _ = cache_key
+    path = os.path.join(store_dir, f"{digest}_{max_number}{STORE_EXTENSION}")
+    if not os.path.exists(path):
+        os.makedirs(store_dir, exist_ok=True)
+        write_history(path, analysis.historic_rounds, max_number)
+    rounds, _ = open_history(path)
+    return replace(analysis, historic_rounds=rounds)
 
 
 # --- Secțiunea 1: Configurare & Încarcare date ---
@@ -458,13 +153,9 @@ tab1, tab2 = st.tabs(["📁 Import Fișier", "✍️ Manual"])
 
 uploaded_file = None
 manual_input = ""
-lines = []
 
 with tab1:
     uploaded_file = st.file_uploader("📂 CSV/TXT cu extragerile din runde", type=["csv", "txt"])
-    if uploaded_file:
-        content = uploaded_file.read().decode("utf-8")
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
 
 with tab2:
     st.subheader("✍️ Adaugă rundele manual")
@@ -472,20 +163,48 @@ with tab2:
                                 help=f"Exemplu: 1,12,25,30,44,51,68,79")
 
 if st.button("✅ Procesează rundele și rulează analiza"):
-    if uploaded_file and lines:
-        results = proceseaza_runde(lines, variant_size)
-    elif manual_input.strip():
-        lines = [line.strip() for line in manual_input.split("\n") if line.strip()]
-        results = proceseaza_runde(lines, variant_size)
+    # Conținutul e citit (fără decodare) doar la apăsarea butonului, nu la fiecare rerulare
+    raw = uploaded_file.getvalue() if uploaded_file else b""
+    if not raw.strip() and manual_input.strip():
+        raw = manual_input.encode("utf-8")
+
+    analysis = None
+    if raw.strip():
+        analysis_cache = get_analysis_cache()
+        cache_key = content_key(raw, st.session_state.max_number, variant_size)
+        analysis = analysis_cache.get(cache_key)
+        if analysis is not None:
+            st.info("⚡ Rezultatele analizei au fost preluate din cache (același conținut).")
+        else:
+            # Parsarea se face direct pe bytes (vectorizat), fără împărțirea în linii.
+            # Agregatele se păstrează între procesări: dacă doar s-au adăugat runde noi
+            # la finalul istoricului, se procesează numai sufixul nou.
+            incremental = st.session_state.incremental
+            if incremental is None or incremental.max_number != st.session_state.max_number:
+                incremental = IncrementalAnalysis(st.session_state.max_number)
+                st.session_state.incremental = incremental
+            try:
+                new_rounds, full = incremental.update_bytes(raw)
+                analysis = incremental.context(variant_size)
+                if not full:
+                    st.info(f"🔁 Actualizare incrementală: **{new_rounds}** runde noi adăugate.")
+            except RoundParseError as e:
+                st.error(str(e))
+            if analysis is not None:
+                analysis = persist_history(analysis, cache_key)
+                if isinstance(analysis.historic_rounds, np.memmap):
+                    # istoricul e pe disc: sesiunea păstrează doar memmap-ul, nu și buffer-ul rundelor
+                    incremental.attach_rounds(analysis.historic_rounds)
+                analysis_cache.put(cache_key, analysis)
     else:
         st.warning("⚠️ Te rugăm să încarci sau să introduci datele.")
-        results = None
 
-    if results is not None:
-        frequency, sorted_freq, all_numbers = results
+    if analysis is not None:
+        st.session_state.analysis = analysis
+        st.session_state.analysis_version += 1
         st.session_state.process_ran = True 
-        st.success(f"✅ Analiză completă pe **{len(st.session_state.historic_rounds)}** runde.")
-        st.info(f"Repetiții mediane runda N-1: **{st.session_state.avg_reps}**")
+        st.success(f"✅ Analiză completă pe **{len(analysis.historic_rounds)}** runde.")
+        st.info(f"Repetiții mediane runda N-1: **{analysis.avg_reps}**")
 
 
 st.markdown("---")
@@ -493,6 +212,8 @@ st.markdown("---")
 # --- Secțiunea 2: Configurare filtre ---
 st.header("2. Configurare Filtre (Rece & Cald)")
 
+analysis = st.session_state.analysis
+
 col1, col2 = st.columns(2)
 exclude_numbers = set()
 
@@ -503,9 +224,9 @@ with col1:
 
     if exclude_mode in ["🔢 Exclude cele mai reci", "🔀 Ambele"]:
         auto_cold_count = st.selectbox("Exclude topul celor mai reci N numere", [0, 5, 10, 15, 20, 30], index=0)
-        if st.session_state.frequency and auto_cold_count > 0:
-            sorted_freq_items = sorted(st.session_state.frequency.items(), key=lambda x: x[1], reverse=True)
-            auto_exclude = set([x[0] for x in sorted_freq_items[-auto_cold_count:]])
+        if analysis and auto_cold_count > 0:
+            auto_exclude = memo("coldest", (st.session_state.analysis_version, auto_cold_count),
+                                lambda: coldest_numbers(analysis.frequency, auto_cold_count))
             st.info(f"🔴 Auto-exclude: {sorted(auto_exclude)}")
 
     if exclude_mode in ["✍️ Manual", "🔀 Ambele"]:
@@ -518,6 +239,8 @@ with col1:
             except ValueError:
                 st.error("Te rugăm să introduci numere întregi valide separate prin virgulă.")
                  
+    # excluderile manuale, separat: backtestul recalculează cele mai reci numere la fiecare rundă
+    manual_exclude_numbers = set(exclude_numbers)
     exclude_numbers.update(auto_exclude)
     if exclude_numbers:
         st.success(f"📌 Total excluse: **{len(exclude_numbers)}** numere.")
@@ -526,14 +249,18 @@ with col2:
     st.subheader("🔥 Numere pentru generare (Top N Frecvență)")
     top_count = st.slider("Câte numere fierbinți să păstrezi?", 10, st.session_state.max_number, min(st.session_state.max_number, 50), 1)
     
-    if st.session_state.frequency:
-        sorted_freq_items = sorted(st.session_state.frequency.items(), key=lambda x: x[1], reverse=True)
-        top_numbers = [x[0] for x in sorted_freq_items if x[0] not in exclude_numbers][:top_count]
+    if analysis:
+        def select_numbers():
+            top = select_top_numbers(analysis.frequency, exclude_numbers, top_count)
+            cold = [(num, age) for num, age in analysis.cold_data.items() if num not in top and num not in exclude_numbers]
+            return top, cold
+
+        top_numbers, cold_candidates_info = memo(
+            "top_numbers", (st.session_state.analysis_version, frozenset(exclude_numbers), top_count), select_numbers
+        )
         st.session_state.top_numbers = top_numbers
         st.success(f"✅ **{len(top_numbers)}** numere disponibile pentru generare.")
         
-        cold_data = analyze_cold_streak(st.session_state.historic_rounds, st.session_state.max_number)
-        cold_candidates_info = [(num, age) for num, age in cold_data.items() if num not in top_numbers and num not in exclude_numbers]
         if cold_candidates_info:
             st.markdown(f"**Cei mai reci (disponibili):** {', '.join([f'{n}({a}r)' for n, a in cold_candidates_info[:5]])}")
 
@@ -545,7 +272,8 @@ st.header("3. Strategii de Generare Avansată")
 col_num, col_depth, col_comb = st.columns(3)
 
 with col_num:
-    num_variants = st.number_input("Câte variante unice să generezi?", 10, 10000, 1000, 10)
+    # generarea rulează în fundal, deci și seturile de milioane de variante sunt posibile
+    num_variants = st.number_input("Câte variante unice să generezi?", 10, 5_000_000, 1000, 10)
 
 with col_depth:
     st.session_state.history_depth = st.selectbox(
@@ -562,28 +290,23 @@ with col_comb:
         st.warning("⚠️ Tripletele necesită varianta de minim 3. Se vor folosi Perechi.")
         use_triplets = False
 
+    batch_mode = st.checkbox("⚡ Generare vectorizată (NumPy batch)", value=False,
+                             help="Fiecare strategie trage mii de variante odată, cu deduplicare în bloc. Recomandat pentru seturi mari.")
+    workers = st.number_input("🧵 Procese paralele", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1,
+                              help="Generarea e împărțită în sarcini cu seed-uri proprii; cu același seed rezultatul nu depinde de numărul de procese.")
+    seed_text = st.text_input("🎲 Seed (opțional, pentru rezultate reproductibile)", value="")
+    wheel_mode = st.checkbox("🎡 Sistem de acoperire (wheeling) peste Top N", value=False,
+                             help="În locul extragerilor independente, alege greedy variante care acoperă toate t-subseturile "
+                                  "din Top N cu cât mai puține bilete (maximum numărul de variante cerut).")
+    cover_t = st.slider("t (mărimea subseturilor acoperite)", min_value=1, max_value=max(variant_size, 1),
+                        value=min(3, variant_size), disabled=not wheel_mode)
+    adaptive_mode = st.checkbox("🧭 Planificare adaptivă a strategiilor", value=False,
+                                help="Încercările se împart după randamentul recent al fiecărei strategii; strategiile care nu "
+                                     "mai produc variante noi sunt retrase, iar generarea se oprește devreme când toate sunt epuizate.")
+    profile_cpu = st.checkbox("⏱️ Profilare CPU a generării (cProfile)", value=False)
+    profile_memory = st.checkbox("🧠 Urmărire memorie a generării (tracemalloc)", value=False,
+                                 help="Încetinește vizibil generarea; doar pentru diagnostic.")
 
-ALL_STRATEGIES = {
-    "🎯 Standard (Aleatoriu Uniform)": "standard", 
-    "🔥 Hot Numbers (3 din top 10 + rest ponderat)": "hot_numbers", 
-    "❄️ Cold-Hot Hybrid (Mix 50/50 ponderat)": "cold_hot_hybrid", 
-    "⚡ Frecvență Ponderată (Fără Repetiție)": "weighted_frequency",
-    "🥇 Perechi/Triplete de Aur (Bază Combinatorie + Rest din Top N)": "golden_pairs",
-    "🔄 Par-Impar Echilibrat (Generare Forțată)": "parity_balance",
-    "🗺️ Câmpuri de Forță (Minimum 3 Cadrane)": "quadrant_force",
-    "🕰️ Aproape de Întoarcere (Include numere 'în vârstă')": "return_age", 
-    "⛓️ Numere Consecutive (Asigură o pereche)": "consecutive_pair",
-    "⭐ Frecvență & Vecinătate": "frequency_neighbors",
-    "💡 Restantierul (Cold Booster)": "cold_booster",
-    "⚖️ Somă Medie (Selecție Ponderată pe Suma Optimă)": "average_sum_weighted", 
-    "🧬 Adâncimea Istoriei (Aderență la ultimele N runde)": "history_adherence",
-    "🧪 Mix Strategy (Combinație aleatorie a strategiilor)": "mix_strategy",
-    "🌡️ Termometrul (Hot/Cold Ratio 70/30)": "hot_cold_ratio",
-    "🧲 Atracția Vestică (Low Numbers Gravitation)": "low_numbers_gravitation",
-    "📅 Repetiție Zonală (Last Round Quadrant Mirroring)": "quadrant_mirroring",
-    "🔄 Aderență Forțată la Runda Precedentă (Repetiții Istorice)": "forced_repetitions",
-    "📈 Stratificată (Top 15/16-20/21-25 + Rest, doar pentru 4/4)": "stratified_mix", 
-}
 
 st.subheader("☑️ Selectează Strategiile de Generare")
 col_a, col_b = st.columns(2)
@@ -599,341 +322,622 @@ for i, (label, key) in enumerate(strategy_items):
 
 st.session_state.selected_strategies = selected_strategies_keys
 
+strategy_shares = {}
+if adaptive_mode and len(selected_strategies_keys) > 1:
+    with st.expander("🧭 Proporții țintă per strategie"):
+        st.markdown("Ponderea relativă a fiecărei strategii în încercări, înainte de ajustarea după randament.")
+        labels_by_key = {v: k for k, v in ALL_STRATEGIES.items()}
+        share_cols = st.columns(2)
+        for i, key in enumerate(selected_strategies_keys):
+            with share_cols[i % 2]:
+                strategy_shares[key] = st.number_input(labels_by_key[key], min_value=0.0, value=1.0, step=0.5,
+                                                       key=f"share_{key}")
+
+with st.expander("🎯 Constrângeri exacte (sumă, pare, interval, cote pe cadrane)"):
+    st.markdown("Variantele se extrag direct din Top N astfel încât **fiecare** să respecte constrângerile "
+                "(fără filtrare ulterioară); strategiile selectate nu se aplică în acest mod.")
+    max_num_exact = st.session_state.max_number
+    exact_mode = st.checkbox("Activează extragerea cu constrângeri exacte", value=False)
+    exact_weighted = st.checkbox("Ponderat cu frecvența numerelor (altfel uniform)", value=False, disabled=not exact_mode)
+    exact_sum = st.slider("Suma variantei", 0, max_num_exact * variant_size, (0, max_num_exact * variant_size),
+                          disabled=not exact_mode)
+    exact_evens = st.slider("Numere pare", 0, variant_size, (0, variant_size), disabled=not exact_mode)
+    exact_numbers = st.slider("Toate numerele în intervalul", 1, max_num_exact, (1, max_num_exact), disabled=not exact_mode)
+    exact_quadrant_cols = st.columns(4)
+    exact_quotas = []
+    for q, col in enumerate(exact_quadrant_cols):
+        with col:
+            exact_quotas.append(st.slider(f"Numere în Q{q + 1}", 0, variant_size, (0, variant_size),
+                                          key=f"exact_q{q + 1}", disabled=not exact_mode))
+
 # --- Generare Logică Principală ---
+#
+# Generarea rulează ca job în fundal (GenerationJob): pagina rămâne interactivă,
+# progresul se reîmprospătează periodic, iar oprirea păstrează variantele acceptate
+# până atunci. Funcția job-ului rulează în alt thread, deci nu apelează Streamlit.
 if st.button("🚀 Generează variante"):
-    if not st.session_state.process_ran:
+    running_job = st.session_state.generation_job
+    if running_job is not None and running_job.running:
+        st.warning("⏳ O generare rulează deja. Oprește-o înainte de a porni alta.")
+    elif not st.session_state.process_ran:
         st.error("❌ Te rugăm să încarci datele și să rulezi analiza în Secțiunea 1.")
     elif not st.session_state.top_numbers:
         st.error("❌ Configurează filtrele în Secțiunea 2 (Numerele disponibile sunt 0).")
     elif variant_size > len(st.session_state.top_numbers):
         st.error(f"❌ Mărimea variantei ({variant_size}) este mai mare decât numerele disponibile ({len(st.session_state.top_numbers)}).")
-    elif not st.session_state.selected_strategies:
+    elif not st.session_state.selected_strategies and not wheel_mode and not exact_mode:
         st.error("❌ Te rugăm să selectezi cel puțin o strategie de generare.")
     else:
-        st.session_state.generation_ran = True 
-
-        top_nums = st.session_state.top_numbers
-        variants = set()
-        num_generated = 0
-        max_attempts = num_variants * 100
-        attempts = 0
-        
-        max_num = st.session_state.max_number
-        cold_data = analyze_cold_streak(st.session_state.historic_rounds, max_num)
-        cold_candidates = [num for num, age in cold_data.items() if num not in top_nums and num not in exclude_numbers]
-        top_pairs = st.session_state.pair_frequency
-        top_triplets = st.session_state.triplet_frequency
+        # Contextul strategiilor (pool-uri, samplere) se construiește o singură dată per rulare
+        sctx = StrategyContext(
+            analysis, st.session_state.top_numbers, variant_size, exclude_numbers,
+            use_triplets, st.session_state.history_depth
+        )
         strategies_to_use = st.session_state.selected_strategies
-        num_strategies = len(strategies_to_use)
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        while num_generated < num_variants and attempts < max_attempts:
-            attempts += 1
-            
-            strategy_key = strategies_to_use[attempts % num_strategies]
-            
-            variant = generate_variant_by_strategy(
-                strategy_key, top_nums, variant_size, exclude_numbers, max_num, 
-                cold_data, top_pairs, top_triplets, cold_candidates, 
-                st.session_state.historic_rounds, st.session_state.avg_reps, use_triplets
-            )
-            
-            if len(variant) == variant_size and is_valid_variant(variant, max_num):
-                final_variant = tuple(sorted(variant))
-                if final_variant not in variants:
-                    variants.add(final_variant)
-                    num_generated += 1
-                    
-                    if num_generated % 50 == 0:
-                        progress = min(num_generated / num_variants, 1.0)
-                        progress_bar.progress(progress)
-                        status_text.text(f"Generare: {num_generated}/{num_variants} variante ({attempts} încercări)")
-
-        progress_bar.progress(1.0)
-        status_text.text(f"Finalizat: {num_generated}/{num_variants} variante")
-        
-        st.session_state.variants = list(variants)
-        random.shuffle(st.session_state.variants)
-        
-        selected_strategy_labels = [k for k, v in ALL_STRATEGIES.items() if v in strategies_to_use]
 
-        if len(st.session_state.variants) > 0:
-            st.success(f"✅ Generate **{len(st.session_state.variants)}** variante UNICE ({variant_size}/{variant_size}) din {num_variants} dorite, în {attempts} încercări, folosind strategiile: **{', '.join(selected_strategy_labels)}**")
-            if len(st.session_state.variants) < num_variants:
-                st.warning(f"⚠️ **ATENȚIE**: Au fost generate doar {len(st.session_state.variants)} din {num_variants} dorite. Mărește 'Top N' din Secțiunea 2.")
+        seed = int(seed_text) if seed_text.strip().isdigit() else None
+        space = feasible_space(sctx, strategies_to_use)
+        messages = []
+        if num_variants > space and covers_feasible_space(strategies_to_use):
+            messages.append(("warning", f"⚠️ Cu {len(st.session_state.top_numbers)} numere disponibile există doar **{space}** combinații "
+                                        f"{variant_size}/{variant_size} posibile; se vor genera toate."))
+        elif num_variants > space:
+            messages.append(("warning", f"⚠️ Cu {len(st.session_state.top_numbers)} numere disponibile există cel mult **{space}** combinații "
+                                        f"{variant_size}/{variant_size}, iar strategiile selectate pot atinge doar o parte din ele."))
+        # metrici per strategie pentru modurile bazate pe strategii (scalar, batch, paralel)
+        metrics = GenerationMetrics(strategies_to_use)
+        scheduler = AdaptiveScheduler(strategies_to_use, strategy_shares) if adaptive_mode else None
+        run_profile = RunProfile(cpu=profile_cpu, memory=profile_memory)
+        constraints = VariantConstraints(exact_sum, exact_evens, exact_numbers, tuple(exact_quotas))
+        enumerate_space = not wheel_mode and not exact_mode and should_enumerate(sctx, strategies_to_use, num_variants)
+        if enumerate_space:
+            # Spațiul e aproape epuizat: ranguri combinatorii distincte, fără coada de respingeri
+            messages.append(("info", f"🧮 Cererea acoperă o parte mare din cele {space} combinații posibile: extragere directă fără respingere."))
+
+        # store-ul completat de generare, din care job-ul dă copii parțiale cât timp rulează
+        # (nu și pentru wheeling / extragerea exhaustivă, care nu au pași intermediari de variante)
+        live_variants = VariantStore(sctx.max_num, variant_size)
+
+        def run_generation(on_progress, cancel):
+            # Întoarce (variante, încercări, acoperire sau None)
+            with run_profile:
+                if wheel_mode:
+                    variants, coverage = generate_covering_variants(
+                        sctx, cover_t, num_variants, rng=seed, cancel=cancel,
+                        on_progress=lambda num_blocks, _: on_progress(num_blocks, num_blocks),
+                    )
+                    return variants, len(variants), coverage
+                if exact_mode:
+                    return (*generate_constrained_variants(
+                        sctx, constraints, num_variants, weighted=exact_weighted, rng=seed, on_progress=on_progress,
+                        cancel=cancel, variants=live_variants,
+                    ), None)
+                if enumerate_space:
+                    return (*generate_variants_exhaustive(sctx, strategies_to_use, num_variants, rng=seed), None)
+                if workers > 1 or seed is not None:
+                    return (*generate_variants_parallel(
+                        sctx, strategies_to_use, num_variants, on_progress=on_progress, seed=seed, workers=workers, batch=batch_mode,
+                        metrics=metrics, scheduler=scheduler, cancel=cancel, variants=live_variants,
+                    ), None)
+                generate = generate_variants_batch if batch_mode else generate_variants
+                return (*generate(sctx, strategies_to_use, num_variants, on_progress=on_progress, metrics=metrics,
+                                  scheduler=scheduler, cancel=cancel, variants=live_variants), None)
+
+        streams_variants = not wheel_mode and not enumerate_space
+        st.session_state.generation_job = GenerationJob(run_generation, num_variants,
+                                                        variants=live_variants if streams_variants else None)
+        st.session_state.generation_request = dict(
+            num_variants=num_variants, variant_size=variant_size, strategies=strategies_to_use, wheel_mode=wheel_mode,
+            cover_t=cover_t, metrics=metrics, scheduler=scheduler,
+            run_profile=run_profile if (profile_cpu or profile_memory) else None, messages=messages,
+        )
+        st.session_state.generation_messages = []
+
+
+def finish_generation(job):
+    # Rezultatul job-ului (complet sau oprit la cerere) devine setul curent de variante
+    request = st.session_state.generation_request
+    st.session_state.generation_job = None
+    st.session_state.generation_request = None
+    st.session_state.generation_partial = None
+    if job.error is not None:
+        st.session_state.generation_messages = [("error", f"❌ {job.error}")]
+        return
+
+    variants, attempts, coverage = job.result
+    num_variants, variant_size = request["num_variants"], request["variant_size"]
+    metrics, scheduler = request["metrics"], request["scheduler"]
+    st.session_state.generation_ran = True
+    st.session_state.variants = variants
+    st.session_state.variants_version += 1
+    st.session_state.history_hits = None
+    st.session_state.variant_stats = None
+    st.session_state.exports = {}
+    st.session_state.generation_metrics = metrics if any(m.attempts for m in metrics.by_strategy.values()) else None
+    run_profile = request["run_profile"]
+    st.session_state.generation_profile = run_profile if run_profile is not None and not run_profile.busy else None
+
+    messages = list(request["messages"])
+    if run_profile is not None and run_profile.busy:
+        messages.append(("info", "🔬 Profilarea a fost omisă: o altă generare de pe server era deja profilată."))
+    if coverage is not None:
+        cover_t = request["cover_t"]
+        messages.append(("info", f"🎡 Acoperire {cover_t} din {variant_size}: **{coverage:.1%}** din {cover_t}-subseturile Top N, cu {len(variants)} variante."))
+    if job.cancelled:
+        messages.append(("info", f"⏹️ Generare oprită după {job.elapsed:.1f} s: se folosesc cele **{len(variants)}** variante generate până atunci."))
+
+    selected_strategy_labels = [k for k, v in ALL_STRATEGIES.items() if v in request["strategies"]]
+    retired_labels = [k for k, v in ALL_STRATEGIES.items() if scheduler is not None and v in scheduler.retired_strategies()]
+    excluded_labels = [k for k, v in ALL_STRATEGIES.items() if scheduler is not None and v in scheduler.excluded_strategies()]
+    if excluded_labels:
+        messages.append(("info", f"🚫 Strategii excluse (proporție țintă 0): **{', '.join(excluded_labels)}**"))
+
+    if len(variants) > 0:
+        messages.append(("success", f"✅ Generate **{len(variants)}** variante UNICE ({variant_size}/{variant_size}) din {num_variants} dorite, în {attempts} încercări, folosind strategiile: **{', '.join(selected_strategy_labels)}**"))
+        if retired_labels:
+            messages.append(("info", f"🧭 Strategii retrase (nu mai produceau variante noi): **{', '.join(retired_labels)}**"))
+        if len(variants) < num_variants and not job.cancelled:
+            messages.append(("warning", f"⚠️ **ATENȚIE**: Au fost generate doar {len(variants)} din {num_variants} dorite. Mărește 'Top N' din Secțiunea 2."))
+    else:
+        messages.append(("error", f"❌ Nu s-a putut genera nicio variantă unică. Încercări totale: {attempts}."))
+    st.session_state.generation_messages = messages
+
+
+def render_generation_job():
+    # Progresul job-ului; la final, rezultatul se preia și pagina se rerulează complet
+    job = st.session_state.generation_job
+    if job is None:
+        return
+    if not job.running:
+        finish_generation(job)
+        st.rerun()
+    st.progress(job.fraction)
+    rate = job.generated / job.elapsed if job.elapsed > 0 else 0.0
+    st.text(f"Generare: {job.generated}/{job.target} variante ({job.attempts} încercări, {rate:,.0f} variante/s)")
+    if job.cancelled:
+        st.info("⏹️ Se oprește după blocul curent...")
+    elif st.button("⏹️ Oprește și păstrează variantele generate"):
+        job.cancel()
+    if job.variants is not None and st.button("👁️ Variantele generate până acum"):
+        # copie făcută de thread-ul generării; job-ul continuă neatins. Copia rămâne afișată
+        # la reîmprospătările periodice, până la o nouă cerere sau până la finalul job-ului
+        st.session_state.generation_partial = job.partial()
+    partial_rows = st.session_state.generation_partial
+    if partial_rows is not None:
+        if not len(partial_rows):
+            st.info("Încă nu există variante acceptate; încearcă din nou peste câteva secunde.")
         else:
-            st.error(f"❌ Nu s-a putut genera nicio variantă unică. Încercări totale: {attempts}.")
+            st.dataframe(
+                {"Combinație (Format Export)": list(format_export_lines(partial_rows[:JOB_PREVIEW_ROWS]))},
+                use_container_width=True,
+            )
+            st.download_button(
+                f"⬇️ Descarcă cele {len(partial_rows)} variante (TXT)",
+                "\n".join(format_export_lines(partial_rows)), "variante_partiale.txt", "text/plain",
+            )
+    if poll_fragment is None:
+        # fără fragmente periodice: pagina întreagă se reîmprospătează cât timp rulează job-ul
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+
+if poll_fragment is not None:
+    render_generation_job = poll_fragment(run_every=JOB_POLL_SECONDS)(render_generation_job)
+
+if st.session_state.generation_job is not None:
+    render_generation_job()
+for kind, text in st.session_state.generation_messages:
+    getattr(st, kind)(text)
+
+# Metricile ultimei generări: ce strategii irosesc încercări (duplicate / variante incomplete)
+@fragment
+def render_generation_report():
+    import pandas as pd
+
+    if st.session_state.generation_metrics is not None:
+        with st.expander("📈 Metrici generare per strategie"):
+            gen_metrics = st.session_state.generation_metrics
+            metrics_df = pd.DataFrame(gen_metrics.records()).rename(columns={
+                "strategy": "Strategie", "seconds": "Timp (s)", "attempts": "Încercări", "accepted": "Acceptate",
+                "duplicates": "Duplicate", "invalid": "Incomplete", "yield": "Randament",
+                "accepted_per_second": "Acceptate/s",
+            })
+            st.markdown(f"Timp total de generare: **{gen_metrics.wall_seconds:.2f} s**")
+            st.dataframe(metrics_df, use_container_width=True, hide_index=True)
+            col_m1, col_m2 = st.columns(2)
+            with col_m1:
+                st.download_button("⬇️ Metrici (CSV)", metrics_df.to_csv(index=False), "metrici_generare.csv", "text/csv")
+            with col_m2:
+                st.download_button("⬇️ Metrici (JSON)", json.dumps(gen_metrics.to_dict(), indent=2),
+                                   "metrici_generare.json", "application/json")
+
+    if st.session_state.generation_profile is not None:
+        with st.expander("🔬 Profil generare"):
+            gen_profile = st.session_state.generation_profile
+            if gen_profile.cpu_report:
+                st.code(gen_profile.cpu_report)
+                st.download_button("⬇️ Raport cProfile", gen_profile.cpu_report, "profil_cpu.txt", "text/plain")
+            if gen_profile.memory_report:
+                st.code(gen_profile.memory_report)
+                st.download_button("⬇️ Raport tracemalloc", gen_profile.memory_report, "profil_memorie.txt", "text/plain")
+
+
+if st.session_state.generation_ran and (st.session_state.generation_metrics is not None
+                                        or st.session_state.generation_profile is not None):
+    render_generation_report()
 
 
 st.markdown("---")
 
 # --- Secțiunea 4: Preview & Export ---
+#
+# Fiecare bloc cu widget-uri proprii (Top N, format export, potriviri, filtre) e un
+# fragment: o schimbare acolo re-execută doar blocul respectiv. Statisticile, graficul
+# și preview-ul sunt memoizate per set de variante (variants_version).
+
+def lazy_download(label, key, build, file_name, mime):
+    # Fișierul se construiește doar la cerere, direct din matricea de variante;
+    # până atunci nu există nicio copie text în memorie, iar după aceea doar una.
+    if key not in st.session_state.exports:
+        if not st.button(f"📦 Pregătește: {label}", key=f"prepare_{key}"):
+            return
+        with st.spinner("Se pregătește fișierul..."):
+            st.session_state.exports[key] = build()
+    st.download_button(f"⬇️ {label}", st.session_state.exports[key], file_name, mime, key=f"download_{key}")
+
+
+@fragment
+def render_overview(stats, analysis):
+    import pandas as pd
+
+    version = st.session_state.variants_version
+
+    # Selector pentru Top N în statistică
+    st.session_state.top_stats_count = st.selectbox(
+        "Afișează Top N numere folosite în statistici:",
+        options=[10, 15, 20, 25, 30],
+        index=0
+    )
 
-if st.session_state.generation_ran: 
-    st.header("4. Preview și Export")
-    
-    export_lines = []
+    st.subheader(f"Statistici Variante Generate ({len(st.session_state.variants)} variante)")
 
-    if st.session_state.variants:
-        
-        # Selector pentru Top N în statistică
-        st.session_state.top_stats_count = st.selectbox(
-            "Afișează Top N numere folosite în statistici:",
-            options=[10, 15, 20, 25, 30],
-            index=0
+    col_g1, col_g2 = st.columns(2)
+    with col_g1:
+        top_generated = stats.top_numbers(st.session_state.top_stats_count)
+        st.info(f"Top {st.session_state.top_stats_count} numere folosite: {', '.join([f'{n}({f}x)' for n, f in top_generated])}")
+
+    with col_g2:
+        st.info(f"Număr mediu de repetiții cu runda precedentă: **{analysis.avg_reps}**")
+
+    preview_count = min(20, len(st.session_state.variants))
+    st.subheader(f"Preview (Primele {preview_count} variante)")
+
+    def build_preview():
+        # FORMATUL FINAL CERUT PENTRU EXPORT: ID, spațiu Numere
+        preview_lines = format_export_lines(st.session_state.variants[:preview_count])
+        preview_data_app = [[i+1, line] for i, line in enumerate(preview_lines)]
+        return pd.DataFrame(preview_data_app, columns=["ID", "Combinație (Format Export)"])
+
+    st.dataframe(memo("preview", version, build_preview), use_container_width=True, hide_index=True)
+
+    # BUTONUL DE DESCARCARE (TXT simplu sau comprimat, NumPy/Parquet pentru seturi foarte mari)
+    export_format = st.selectbox(
+        "Format export:",
+        options=available_formats(),
+        format_func=lambda fmt: f"{EXPORT_FORMATS[fmt]} (.{fmt})",
+    )
+    lazy_download(
+        f"Descarcă variantele ({export_format})",
+        f"variants_{export_format}",
+        lambda: export_bytes(st.session_state.variants.rows, export_format),
+        f"variante_generate_eficient.{export_format}",
+        "text/plain" if export_format == "txt" else "application/octet-stream",
+    )
+
+
+def frequency_chart(stats):
+    import pandas as pd
+
+    freq_df = pd.DataFrame(stats.top_numbers(30), columns=["Număr", "Frecvență"])
+    try:
+        import plotly.express as px
+    except ImportError:  # opțional: fără plotly, graficul simplu din Streamlit
+        return None, freq_df
+    fig = px.bar(
+        freq_df,
+        x="Număr",
+        y="Frecvență",
+        title=f"Top 30 Numere Cel Mai Frecvent Generate",
+        color="Frecvență",
+        color_continuous_scale="viridis"
+    )
+    fig.update_layout(height=400)
+    return fig, freq_df
+
+
+def render_details(stats, analysis, max_num):
+    # Fără widget-uri: rulează doar la rerularea completă a paginii
+    col_stats1, col_stats2, col_stats3 = st.columns(3)
+
+    with col_stats1:
+        st.metric("Suma medie", f"{stats.sums.mean():.1f}")
+        st.metric("Suma min/max", f"{stats.sums.min()} / {stats.sums.max()}")
+
+    with col_stats2:
+        st.metric("Medie numere pare", f"{stats.evens.mean():.1f}")
+        st.metric("Medie numere impare", f"{stats.odds.mean():.1f}")
+
+    with col_stats3:
+        st.metric("Range mediu", f"{stats.ranges.mean():.1f}")
+        st.metric("Range min/max", f"{stats.ranges.min()} / {stats.ranges.max()}")
+
+    # Analiză distribuție pe cadrane
+    st.markdown("### 🗺️ Distribuție pe Cadrane")
+    quadrant_dist = {q + 1: int(c) for q, c in enumerate(stats.quadrant_counts)}
+
+    col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+    total_nums = sum(quadrant_dist.values())
+
+    with col_q1:
+        pct = (quadrant_dist[1] / total_nums * 100) if total_nums > 0 else 0
+        st.metric(f"Q1 (1-{max_num//4})", f"{quadrant_dist[1]}", f"{pct:.1f}%")
+    with col_q2:
+        pct = (quadrant_dist[2] / total_nums * 100) if total_nums > 0 else 0
+        st.metric(f"Q2 ({max_num//4+1}-{max_num//2})", f"{quadrant_dist[2]}", f"{pct:.1f}%")
+    with col_q3:
+        pct = (quadrant_dist[3] / total_nums * 100) if total_nums > 0 else 0
+        st.metric(f"Q3 ({max_num//2+1}-{3*max_num//4})", f"{quadrant_dist[3]}", f"{pct:.1f}%")
+    with col_q4:
+        pct = (quadrant_dist[4] / total_nums * 100) if total_nums > 0 else 0
+        st.metric(f"Q4 ({3*max_num//4+1}-{max_num})", f"{quadrant_dist[4]}", f"{pct:.1f}%")
+
+    # Grafic vizualizare frecvență numere generate (construit o dată per set de variante)
+    st.markdown("### 📊 Frecvența Numerelor Generate")
+    fig, freq_df = memo("frequency_chart", st.session_state.variants_version, lambda: frequency_chart(stats))
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.bar_chart(freq_df, x="Număr", y="Frecvență")
+
+    # Analiză consecutive
+    st.markdown("### ⛓️ Analiză Perechi Consecutive")
+    consecutive_count = int(stats.consecutive.sum())
+    consecutive_pct = (consecutive_count / stats.count * 100)
+    st.info(f"**{consecutive_count}** variante ({consecutive_pct:.1f}%) conțin cel puțin o pereche consecutivă")
+
+    # Analiză perechi populare
+    st.markdown("### 🥇 Top Perechi în Variante Generate")
+    top_gen_pairs = list(stats.top_pairs.items())
+    if top_gen_pairs:
+        pairs_text = ", ".join([f"({p[0]},{p[1]}): {cnt}x" for p, cnt in top_gen_pairs])
+        st.info(f"**Top 15 perechi:** {pairs_text}")
+
+    # Comparație cu istoricul
+    if analysis.pair_frequency:
+        st.markdown("### 🔍 Comparație cu Istoricul")
+
+        hist_top_pairs = list(analysis.pair_frequency.keys())[:10]
+        gen_top_pairs = [p for p, _ in top_gen_pairs[:10]]
+
+        overlap = len(set(hist_top_pairs) & set(gen_top_pairs))
+        st.info(f"**{overlap}/10** din perechile cele mai frecvente din istoric apar și în top 10 generate")
+
+
+# Potrivirile istorice și exporturile avansate stau în același fragment,
+# fiindcă CSV-ul cu statistici include potrivirile, odată calculate
+@fragment
+def render_hits_and_exports(stats, analysis, max_num):
+    import pandas as pd
+
+    # Potriviri istorice (bit-paralel: popcount(variantă & rundă) pe tot istoricul)
+    st.markdown("### 🎯 Potriviri în Istoric")
+    if st.button("Calculează de câte ori ar fi câștigat fiecare variantă în istoric"):
+        hits_progress = st.progress(0)
+        st.session_state.history_hits = history_hit_histograms(
+            st.session_state.variants.rows, analysis.historic_rounds, max_num,
+            on_progress=lambda done, total: hits_progress.progress(done / total),
         )
+    history_hits = st.session_state.history_hits
+    if history_hits is not None and len(history_hits) != len(st.session_state.variants):
+        history_hits = None
+    if history_hits is not None:
+        hits_k = history_hits.shape[1] - 1
+
+        def build_hits_table():
+            hit_levels = list(range(hits_k, max(hits_k - 4, 0), -1))
+            order = rank_by_hits(history_hits)[:20]
+            rows_sorted = st.session_state.variants.rows
+            return pd.DataFrame(
+                [[int(i) + 1, " ".join(map(str, rows_sorted[i].tolist()))] + [int(history_hits[i, h]) for h in hit_levels]
+                 for i in order],
+                columns=["ID", "Varianta"] + [f"{h}/{hits_k}" for h in hit_levels],
+            )
 
-        generated_nums = []
-        for v in st.session_state.variants:
-            generated_nums.extend(v)
-        generated_freq = Counter(generated_nums)
-        
-        st.subheader(f"Statistici Variante Generate ({len(st.session_state.variants)} variante)")
-        
-        col_g1, col_g2 = st.columns(2)
-        with col_g1:
-            top_generated = sorted(generated_freq.items(), key=lambda x: x[1], reverse=True)[:st.session_state.top_stats_count]
-            st.info(f"Top {st.session_state.top_stats_count} numere folosite: {', '.join([f'{n}({f}x)' for n, f in top_generated])}")
-            
-        with col_g2:
-            st.info(f"Număr mediu de repetiții cu runda precedentă: **{st.session_state.avg_reps}**")
+        hits_df = memo("hits_table", (st.session_state.variants_version, id(history_hits)), build_hits_table)
+        st.markdown(f"Top 20 variante după potrivirile pe **{len(analysis.historic_rounds)}** runde istorice:")
+        st.dataframe(hits_df, use_container_width=True, hide_index=True)
+
+    # Opțiuni export avansate
+    st.markdown("---")
+    st.subheader("📤 Opțiuni Export Avansate")
+
+    col_exp1, col_exp2 = st.columns(2)
+
+    def build_stats_csv():
+        # Export CSV cu detalii
+        csv_df = pd.DataFrame({
+            "ID": np.arange(1, stats.count + 1),
+            "Varianta": list(format_export_lines(st.session_state.variants, with_id=False)),
+            "Suma": stats.sums,
+            "Pare": stats.evens,
+            "Impare": stats.odds,
+            "Range": stats.ranges,
+            "Min": stats.mins,
+            "Max": stats.maxs,
+        })
+        if history_hits is not None:
+            for h in range(hits_k, -1, -1):
+                csv_df[f"Potriviri {h}/{hits_k}"] = history_hits[:, h]
+        return csv_df.to_csv(index=False).encode("utf-8")
+
+    with col_exp1:
+        # CSV-ul depinde și de potrivirile istorice, deci cheia include dacă ele există
+        lazy_download(
+            "Descarcă CSV cu Statistici",
+            f"stats_csv_{history_hits is not None}",
+            build_stats_csv,
+            "variante_cu_statistici.csv",
+            "text/csv",
+        )
 
-        
-        preview_count = min(20, len(st.session_state.variants))
-        st.subheader(f"Preview (Primele {preview_count} variante)")
-        
-        preview_data_app = []
-        for i, v in enumerate(st.session_state.variants):
-            variant_str_space = " ".join(map(str, sorted(v)))
-            
-            # FORMATUL FINAL CERUT PENTRU EXPORT: ID, spațiu Numere
-            export_lines.append(f"{i+1}, {variant_str_space}")
-            
-            preview_data_app.append([i+1, f"{i+1}, {variant_str_space}"])
-        
-        
-        preview_df = pd.DataFrame(
-            preview_data_app[:preview_count], 
-            columns=["ID", "Combinație (Format Export)"]
+    with col_exp2:
+        # Export doar numere (fără ID)
+        lazy_download(
+            "Descarcă Doar Numere",
+            "simple_txt",
+            lambda: export_bytes(st.session_state.variants.rows, "txt", with_id=False),
+            "variante_simple.txt",
+            "text/plain",
         )
-        st.dataframe(preview_df, use_container_width=True, hide_index=True)
 
-        
-        txt_output = "\n".join(export_lines)
-        
-    else: 
-        txt_output = ""
-        st.warning("⚠️ Nu s-au generat variante valide. Fișierul exportat va fi gol.")
 
+@fragment
+def render_filter(stats, max_num):
+    with st.expander("Aplică filtre personalizate"):
+        # Filtrele rulează pe coloanele precalculate (indexuri sortate), deci se aplică la fiecare modificare
+        k = stats.variant_size
+        col_f1, col_f2, col_f3 = st.columns(3)
+
+        with col_f1:
+            suma_min = st.number_input("Suma minimă", 0, max_num * k, 0)
+            suma_max = st.number_input("Suma maximă", 0, max_num * k, max_num * k)
+
+        with col_f2:
+            pare_min = st.number_input("Număr minim de pare", 0, k, 0)
+            pare_max = st.number_input("Număr maxim de pare", 0, k, k)
+
+        with col_f3:
+            range_min = st.number_input("Range minim", 0, max_num, 0)
+            range_max = st.number_input("Range maxim", 0, max_num, max_num)
+
+        quadrant_cols = st.columns(4)
+        quadrant_bounds = {}
+        for q, col in enumerate(quadrant_cols):
+            with col:
+                quadrant_bounds[f"q{q + 1}"] = st.slider(f"Numere în Q{q + 1}", 0, k, (0, k))
+
+        bounds = {"sum": (suma_min, suma_max), "evens": (pare_min, pare_max), "range": (range_min, range_max)}
+        bounds.update(quadrant_bounds)
+        # doar limitele care chiar restrâng ceva
+        full = {"sum": (0, max_num * k), "evens": (0, k), "range": (0, max_num)}
+        bounds = {name: b for name, b in bounds.items() if tuple(b) != full.get(name, (0, k))}
+        filtered_ids = stats.select(bounds)
+
+        if len(filtered_ids):
+            st.success(f"✅ {len(filtered_ids)} variante îndeplinesc criteriile")
+            filtered_rows = st.session_state.variants.rows[filtered_ids]
+
+            # Export variante filtrate: se formatează doar rândurile selectate, la cerere
+            filter_key = f"filtered_{sorted(bounds.items())}"
+            for stale in [key for key in st.session_state.exports if key.startswith("filtered_") and key != filter_key]:
+                del st.session_state.exports[stale]
+            lazy_download(
+                "Descarcă Variante Filtrate",
+                filter_key,
+                lambda: export_bytes(filtered_rows, "txt"),
+                "variante_filtrate.txt",
+                "text/plain",
+            )
+
+            # Preview filtrate
+            preview_filtered = min(10, len(filtered_ids))
+            st.text(f"Preview primele {preview_filtered} variante filtrate:")
+            for i, v in enumerate(filtered_rows[:preview_filtered].tolist()):
+                st.text(f"{i+1}. {' '.join(map(str, v))}")
+        else:
+            st.warning("⚠️ Nicio variantă nu îndeplinește criteriile selectate")
+
+
+if st.session_state.generation_ran:
+    st.header("4. Preview și Export")
+
+    max_num = analysis.max_number
+
+    if st.session_state.variants:
+        # Toate statisticile se calculează o dată per set de variante, nu la fiecare rerulare
+        if st.session_state.variant_stats is None:
+            st.session_state.variant_stats = compute_variant_stats(st.session_state.variants.rows, max_num)
+        stats = st.session_state.variant_stats
+
+        render_overview(stats, analysis)
+    else:
+        st.warning("⚠️ Nu s-au generat variante valide. Nu există nimic de exportat.")
 
-    # BUTONUL DE DESCARCARE
-    st.download_button("⬇️ Descarcă variantele (TXT)", txt_output, "variante_generate_eficient.txt", "text/plain")
-    
     # Statistici suplimentare
     if st.session_state.variants:
         st.markdown("---")
         st.subheader("📊 Analiză Detaliată")
-        
-        col_stats1, col_stats2, col_stats3 = st.columns(3)
-        
-        with col_stats1:
-            sums = [sum(v) for v in st.session_state.variants]
-            st.metric("Suma medie", f"{np.mean(sums):.1f}")
-            st.metric("Suma min/max", f"{min(sums)} / {max(sums)}")
-        
-        with col_stats2:
-            even_counts = [sum(1 for n in v if n % 2 == 0) for v in st.session_state.variants]
-            st.metric("Medie numere pare", f"{np.mean(even_counts):.1f}")
-            st.metric("Medie numere impare", f"{variant_size - np.mean(even_counts):.1f}")
-        
-        with col_stats3:
-            ranges = [max(v) - min(v) for v in st.session_state.variants]
-            st.metric("Range mediu", f"{np.mean(ranges):.1f}")
-            st.metric("Range min/max", f"{min(ranges)} / {max(ranges)}")
-        
-        # Analiză distribuție pe cadrane
-        st.markdown("### 🗺️ Distribuție pe Cadrane")
-        quadrant_dist = {1: 0, 2: 0, 3: 0, 4: 0}
-        for v in st.session_state.variants:
-            for n in v:
-                if n <= max_num // 4:
-                    quadrant_dist[1] += 1
-                elif n <= max_num // 2:
-                    quadrant_dist[2] += 1
-                elif n <= 3 * max_num // 4:
-                    quadrant_dist[3] += 1
-                else:
-                    quadrant_dist[4] += 1
-        
-        col_q1, col_q2, col_q3, col_q4 = st.columns(4)
-        total_nums = sum(quadrant_dist.values())
-        
-        with col_q1:
-            pct = (quadrant_dist[1] / total_nums * 100) if total_nums > 0 else 0
-            st.metric(f"Q1 (1-{max_num//4})", f"{quadrant_dist[1]}", f"{pct:.1f}%")
-        with col_q2:
-            pct = (quadrant_dist[2] / total_nums * 100) if total_nums > 0 else 0
-            st.metric(f"Q2 ({max_num//4+1}-{max_num//2})", f"{quadrant_dist[2]}", f"{pct:.1f}%")
-        with col_q3:
-            pct = (quadrant_dist[3] / total_nums * 100) if total_nums > 0 else 0
-            st.metric(f"Q3 ({max_num//2+1}-{3*max_num//4})", f"{quadrant_dist[3]}", f"{pct:.1f}%")
-        with col_q4:
-            pct = (quadrant_dist[4] / total_nums * 100) if total_nums > 0 else 0
-            st.metric(f"Q4 ({3*max_num//4+1}-{max_num})", f"{quadrant_dist[4]}", f"{pct:.1f}%")
-        
-        # Grafic vizualizare frecvență numere generate
-        st.markdown("### 📊 Frecvența Numerelor Generate")
-        
-        freq_df = pd.DataFrame(
-            sorted(generated_freq.items(), key=lambda x: x[1], reverse=True)[:30],
-            columns=["Număr", "Frecvență"]
-        )
-        
-        import plotly.express as px
-        fig = px.bar(
-            freq_df, 
-            x="Număr", 
-            y="Frecvență",
-            title=f"Top 30 Numere Cel Mai Frecvent Generate",
-            color="Frecvență",
-            color_continuous_scale="viridis"
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Analiză consecutive
-        st.markdown("### ⛓️ Analiză Perechi Consecutive")
-        consecutive_count = 0
-        for v in st.session_state.variants:
-            sorted_v = sorted(v)
-            for i in range(len(sorted_v) - 1):
-                if sorted_v[i+1] == sorted_v[i] + 1:
-                    consecutive_count += 1
-                    break
-        
-        consecutive_pct = (consecutive_count / len(st.session_state.variants) * 100)
-        st.info(f"**{consecutive_count}** variante ({consecutive_pct:.1f}%) conțin cel puțin o pereche consecutivă")
-        
-        # Analiză perechi populare
-        st.markdown("### 🥇 Top Perechi în Variante Generate")
-        gen_pairs = Counter()
-        for v in st.session_state.variants:
-            sorted_v = sorted(v)
-            for pair in itertools.combinations(sorted_v, 2):
-                gen_pairs[pair] += 1
-        
-        top_gen_pairs = gen_pairs.most_common(15)
-        if top_gen_pairs:
-            pairs_text = ", ".join([f"({p[0]},{p[1]}): {cnt}x" for p, cnt in top_gen_pairs])
-            st.info(f"**Top 15 perechi:** {pairs_text}")
-        
-        # Comparație cu istoricul
-        if st.session_state.pair_frequency:
-            st.markdown("### 🔍 Comparație cu Istoricul")
-            
-            hist_top_pairs = list(st.session_state.pair_frequency.keys())[:10]
-            gen_top_pairs = [p for p, _ in top_gen_pairs[:10]]
-            
-            overlap = len(set(hist_top_pairs) & set(gen_top_pairs))
-            st.info(f"**{overlap}/10** din perechile cele mai frecvente din istoric apar și în top 10 generate")
-        
-        # Opțiuni export avansate
-        st.markdown("---")
-        st.subheader("📤 Opțiuni Export Avansate")
-        
-        col_exp1, col_exp2 = st.columns(2)
-        
-        with col_exp1:
-            # Export CSV cu detalii
-            csv_data = []
-            for i, v in enumerate(st.session_state.variants):
-                sorted_v = sorted(v)
-                csv_data.append({
-                    "ID": i+1,
-                    "Varianta": " ".join(map(str, sorted_v)),
-                    "Suma": sum(v),
-                    "Pare": sum(1 for n in v if n % 2 == 0),
-                    "Impare": sum(1 for n in v if n % 2 == 1),
-                    "Range": max(v) - min(v),
-                    "Min": min(v),
-                    "Max": max(v)
-                })
-            
-            csv_df = pd.DataFrame(csv_data)
-            csv_output = csv_df.to_csv(index=False)
-            
-            st.download_button(
-                "⬇️ Descarcă CSV cu Statistici",
-                csv_output,
-                "variante_cu_statistici.csv",
-                "text/csv"
-            )
-        
-        with col_exp2:
-            # Export doar numere (fără ID)
-            simple_export = "\n".join([" ".join(map(str, sorted(v))) for v in st.session_state.variants])
-            
-            st.download_button(
-                "⬇️ Descarcă Doar Numere",
-                simple_export,
-                "variante_simple.txt",
-                "text/plain"
-            )
-        
+        render_details(stats, analysis, max_num)
+        render_hits_and_exports(stats, analysis, max_num)
+
         # Filtru variante după criterii
         st.markdown("---")
         st.subheader("🔎 Filtru Variante După Criterii")
-        
-        with st.expander("Aplică filtre personalizate"):
-            col_f1, col_f2, col_f3 = st.columns(3)
-            
-            with col_f1:
-                suma_min = st.number_input("Suma minimă", 0, max_num * variant_size, 0)
-                suma_max = st.number_input("Suma maximă", 0, max_num * variant_size, max_num * variant_size)
-            
-            with col_f2:
-                pare_min = st.number_input("Număr minim de pare", 0, variant_size, 0)
-                pare_max = st.number_input("Număr maxim de pare", 0, variant_size, variant_size)
-            
-            with col_f3:
-                range_min = st.number_input("Range minim", 0, max_num, 0)
-                range_max = st.number_input("Range maxim", 0, max_num, max_num)
-            
-            if st.button("🔍 Aplică Filtre"):
-                filtered_variants = []
-                for v in st.session_state.variants:
-                    suma = sum(v)
-                    pare = sum(1 for n in v if n % 2 == 0)
-                    rng = max(v) - min(v)
-                    
-                    if (suma_min <= suma <= suma_max and 
-                        pare_min <= pare <= pare_max and 
-                        range_min <= rng <= range_max):
-                        filtered_variants.append(v)
-                
-                if filtered_variants:
-                    st.success(f"✅ {len(filtered_variants)} variante îndeplinesc criteriile")
-                    
-                    # Export variante filtrate
-                    filtered_export = "\n".join([
-                        f"{i+1}, {' '.join(map(str, sorted(v)))}" 
-                        for i, v in enumerate(filtered_variants)
-                    ])
-                    
-                    st.download_button(
-                        "⬇️ Descarcă Variante Filtrate",
-                        filtered_export,
-                        "variante_filtrate.txt",
-                        "text/plain",
-                        key="filtered_download"
-                    )
-                    
-                    # Preview filtrate
-                    preview_filtered = min(10, len(filtered_variants))
-                    st.text(f"Preview primele {preview_filtered} variante filtrate:")
-                    for i, v in enumerate(filtered_variants[:preview_filtered]):
-                        st.text(f"{i+1}. {' '.join(map(str, sorted(v)))}")
-                else:
-                    st.warning("⚠️ Nicio variantă nu îndeplinește criteriile selectate")
\ No newline at end of file
+        render_filter(stats, max_num)
+
+st.markdown("---")
+
+# --- Secțiunea 5: Backtest walk-forward ---
+@fragment
+def render_backtest(analysis, strategy_config):
+    import pandas as pd
+
+    st.header("5. Backtest Strategii (Walk-Forward)")
+    st.markdown("Pentru fiecare rundă testată, analiza folosește doar rundele anterioare; "
+                "variantele fiecărei strategii sunt comparate cu runda reală.")
+
+    num_rounds = len(analysis.historic_rounds)
+    col_bt1, col_bt2 = st.columns(2)
+    with col_bt1:
+        backtest_rounds = st.number_input("Câte runde recente să fie testate?", 1, max(num_rounds - 1, 1),
+                                          min(100, max(num_rounds - 1, 1)), 1)
+    with col_bt2:
+        backtest_variants = st.number_input("Variante per strategie per rundă", 10, 10000, 1000, 10)
+
+    backtest_strategies = st.session_state.selected_strategies or ["standard"]
+    if st.button("📊 Rulează backtest"):
+        if num_rounds < 2:
+            st.error("❌ Backtest-ul are nevoie de cel puțin 2 runde în istoric.")
+        else:
+            bt_progress = st.progress(0)
+            result = walk_forward(
+                analysis.historic_rounds, analysis.max_number, variant_size, backtest_strategies,
+                num_variants=backtest_variants, start=num_rounds - backtest_rounds,
+                history_depth=st.session_state.history_depth,
+                on_progress=lambda done, total: bt_progress.progress(done / total),
+                **strategy_config,
+            )
+            draw_size = int((analysis.historic_rounds[-1] > 0).sum())
+            baseline = random_hit_distribution(analysis.max_number, draw_size, variant_size)
+            label_of = {v: k for k, v in ALL_STRATEGIES.items()}
+            rows = []
+            for key in backtest_strategies:
+                dist = result.distribution(key)
+                rows.append([label_of.get(key, key), round(result.mean_hits(key), 3)] + [f"{p:.2%}" for p in dist])
+            rows.append(["🎲 Aleatoriu (teoretic)", round(float((baseline * np.arange(variant_size + 1)).sum()), 3)]
+                        + [f"{p:.2%}" for p in baseline])
+            st.success(f"✅ Testate **{result.rounds_tested}** runde.")
+            st.dataframe(
+                pd.DataFrame(rows, columns=["Strategie", "Potriviri medii"] + [f"{h}/{variant_size}" for h in range(variant_size + 1)]),
+                use_container_width=True, hide_index=True,
+            )
+
+
+if st.session_state.process_ran and analysis is not None:
+    # Filtrele din Secțiunile 2-3 se transmit explicit, ca fragmentul să le folosească pe cele curente
+    render_backtest(analysis, dict(
+        top_count=top_count,
+        exclude_numbers=manual_exclude_numbers,
+        exclude_cold=auto_cold_count if exclude_mode in ["🔢 Exclude cele mai reci", "🔀 Ambele"] else 0,
+        use_triplets=use_triplets,
+    ))
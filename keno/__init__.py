@@ -0,0 +1,33 @@
+from .analysis import (
+    AnalysisContext,
+    RoundParseError,
+    analyze_cold_streak,
+    analyze_history,
+    analyze_pairs_triplets,
+    analyze_repetitions,
+    proceseaza_runde,
+)
+from .backtest import BacktestResult, walk_forward
+from .batch import BatchGenerator, generate_variants_batch
+from .cache import AnalysisCache, content_key
+from .constrained import ConstrainedSampler, VariantConstraints, generate_constrained_variants
+from .context import StrategyContext
+from .export import EXPORT_FORMATS, available_formats, export_bytes, write_export
+from .generation import feasible_space, generate_variants, generate_variants_exhaustive
+from .hits import history_hit_histograms, pack_bitmasks, rank_by_hits
+from .incremental import IncrementalAnalysis
+from .jobs import GenerationJob
+from .metrics import GenerationMetrics, RunProfile
+from .parallel import generate_variants_parallel
+from .parser import as_rounds_array, parse_rounds_bytes
+from .sampling import WeightedSampler, weighted_sample_unique
+from .scheduler import AdaptiveScheduler, schedule_sequence
+from .stats import VariantStats, compute_variant_stats
+from .store import HistoryStoreError, append_history, open_history, write_history
+from .strategies import (
+    ALL_STRATEGIES,
+    generate_variant_by_strategy,
+    is_valid_variant,
+)
+from .variants import VariantStore, rank_rows, unrank_rows, valid_rows
+from .wheel import CoveringDesign, generate_covering_variants
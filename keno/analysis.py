@@ -0,0 +1,169 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cached_property
+import itertools
+
+import numpy as np
+
+from .cooccurrence import MAX_DENSE_TRIPLET_NUMBER, cooccurrence_counts, incidence_matrix
+from .parser import (
+    RoundParseError,
+    as_rounds_array,
+    iter_round_chunks,
+    parse_rounds_bytes,
+    round_coordinates,
+    round_numbers,
+)
+
+# Câte perechi/triplete păstrează analiza (baza golden_pairs + comparația din Secțiunea 4)
+PAIR_TOP_K = 100
+
+
+# --- Context cu rezultatele analizei (fără Streamlit) ---
+@dataclass
+class AnalysisContext:
+    max_number: int
+    # matricea runde × lățime (uint8/uint16), 0 = poziție liberă
+    historic_rounds: np.ndarray
+    frequency: dict
+    pair_frequency: dict = field(default_factory=dict)
+    triplet_frequency: dict = field(default_factory=dict)
+    avg_reps: int = 0
+    # indexul ultimei apariții pentru fiecare număr (-1 = niciodată), dacă e deja calculat
+    last_seen: object = field(default=None, repr=False)
+
+    # Calculat o singură dată per istoric: contextul rămâne în session_state între rerulări,
+    # deci mutarea unui slider nu mai recalculează vârstele pe tot istoricul.
+    @cached_property
+    def cold_data(self):
+        if self.last_seen is None:
+            self.last_seen = last_seen_index(self.historic_rounds, self.max_number)
+        return cold_streak_from_last_seen(self.last_seen, len(self.historic_rounds))
+
+
+# --- Funcții de suport ---
+def add_combination_counts(counter, rounds, size):
+    # combinațiile de `size` numere ale fiecărei runde; cheile rămân în ordinea primei apariții
+    for row in rounds:
+        counter.update(itertools.combinations(sorted(round_numbers(row).tolist()), size))
+    return counter
+
+
+def analyze_pairs_triplets(rounds, k_size, max_number=None, top_k=None):
+    rounds = as_rounds_array(rounds, max_number)
+    if not len(rounds):
+        return {}, {}
+    if max_number is None:
+        max_number = int(rounds.max())
+    if max_number <= MAX_DENSE_TRIPLET_NUMBER:
+        return cooccurrence_counts(rounds, max_number, k_size, top_k)
+
+    pair_counts = add_combination_counts(Counter(), rounds, 2)
+    triplet_counts = add_combination_counts(Counter(), rounds, 3) if k_size >= 3 else Counter()
+    # sortare stabilă: la egalitate rămâne ordinea primei apariții, ca în ramura densă (_top_entries)
+    sorted_pairs = dict(pair_counts.most_common(top_k))
+    sorted_triplets = dict(triplet_counts.most_common(top_k))
+    return sorted_pairs, sorted_triplets
+
+
+def last_seen_index(rounds, max_num):
+    last_seen = np.full(max_num, -1, dtype=np.int64)
+    for start, block in iter_round_chunks(rounds):
+        rows, cols = round_coordinates(block)
+        np.maximum.at(last_seen, cols, rows + start)
+    return last_seen
+
+
+def cold_streak_from_last_seen(last_seen, num_rounds):
+    # vârsta = câte runde au trecut de la ultima apariție (toate rundele, dacă nu a apărut)
+    ages = np.where(last_seen >= 0, num_rounds - 1 - last_seen, num_rounds)
+    order = np.lexsort((np.arange(len(ages)), -ages))
+    return {int(i) + 1: int(ages[i]) for i in order}
+
+
+def analyze_cold_streak(rounds, max_num):
+    return cold_streak_from_last_seen(last_seen_index(rounds, max_num), len(rounds))
+
+
+def median_from_histogram(hist):
+    # aceeași valoare ca round(np.median(valori)), din histograma valorilor întregi
+    total = int(hist.sum())
+    if total == 0:
+        return 0
+    cumulative = np.cumsum(hist)
+    low = int(np.searchsorted(cumulative, (total - 1) // 2, side="right"))
+    high = int(np.searchsorted(cumulative, total // 2, side="right"))
+    return round((low + high) / 2)
+
+
+def analyze_repetitions(rounds, max_number=None):
+    rounds = as_rounds_array(rounds, max_number)
+    if len(rounds) < 2:
+        return 0
+    max_number = max_number or int(rounds.max())
+    # histograma repetițiilor, pe blocuri; fiecare bloc se leagă de ultima rundă a celui anterior
+    hist = np.zeros(rounds.shape[1] + 1, dtype=np.int64)
+    last_row = None
+    for _, block in iter_round_chunks(rounds):
+        X = incidence_matrix(block, max_number, dtype=bool)
+        prev = X[:-1] if last_row is None else np.vstack([last_row, X[:-1]])
+        nxt = X[1:] if last_row is None else X
+        hist += np.bincount((prev & nxt).sum(axis=1), minlength=len(hist))
+        last_row = X[-1:]
+    return median_from_histogram(hist)
+
+
+def frequency_from_counts(counts, first_seen):
+    # aceeași ordine ca sorted(Counter) pe runde: frecvență descrescătoare, apoi prima apariție
+    seen = np.flatnonzero(counts > 0)
+    order = np.lexsort((first_seen[seen], -counts[seen]))
+    return {int(seen[i]) + 1: int(counts[seen[i]]) for i in order}
+
+
+def parse_rounds(lines, max_number):
+    return parse_rounds_bytes("\n".join(lines), max_number)
+
+
+def analyze_history(rounds_data, variant_size, max_number):
+    if not len(rounds_data):
+        return None
+
+    # frecvențe și prima apariție (poziția globală în ordinea numerelor extrase), pe blocuri
+    counts = np.zeros(max_number, dtype=np.int64)
+    first_seen = np.full(max_number, np.iinfo(np.int64).max, dtype=np.int64)
+    offset = 0
+    for _, block in iter_round_chunks(rounds_data):
+        _, cols = round_coordinates(block)
+        counts += np.bincount(cols, minlength=max_number)
+        np.minimum.at(first_seen, cols, offset + np.arange(len(cols)))
+        offset += len(cols)
+    pair_frequency, triplet_frequency = analyze_pairs_triplets(rounds_data, variant_size, max_number, PAIR_TOP_K)
+    return AnalysisContext(
+        max_number=max_number,
+        historic_rounds=rounds_data,
+        frequency=frequency_from_counts(counts, first_seen),
+        pair_frequency=pair_frequency,
+        triplet_frequency=triplet_frequency,
+        avg_reps=analyze_repetitions(rounds_data, max_number),
+    )
+
+
+def proceseaza_runde(lines, variant_size, max_number):
+    return analyze_history(parse_rounds(lines, max_number), variant_size, max_number)
+
+
+# --- Selecția numerelor pentru generare (Secțiunea 2) ---
+def coldest_numbers(frequency, count):
+    if not frequency or count <= 0:
+        return set()
+    sorted_freq_items = sorted(frequency.items(), key=lambda x: x[1], reverse=True)
+    return set([x[0] for x in sorted_freq_items[-count:]])
+
+
+def select_top_numbers(frequency, exclude_numbers, top_count):
+    sorted_freq_items = sorted(frequency.items(), key=lambda x: x[1], reverse=True)
+    return [x[0] for x in sorted_freq_items if x[0] not in exclude_numbers][:top_count]
+
+
+def select_cold_candidates(cold_data, top_numbers, exclude_numbers):
+    return [num for num, age in cold_data.items() if num not in top_numbers and num not in exclude_numbers]
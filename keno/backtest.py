@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from math import comb
+
+import numpy as np
+
+from .analysis import coldest_numbers, select_top_numbers
+from .batch import generate_variants_batch
+from .context import StrategyContext
+from .incremental import IncrementalAnalysis
+from .parser import as_rounds_array
+
+# Câte runde inițiale formează istoricul minim înainte de prima rundă testată
+BACKTEST_WARMUP = 50
+
+
+def draw_mask(round_row, max_number):
+    mask = np.zeros(max_number + 1, dtype=bool)
+    mask[np.asarray(round_row, dtype=np.int64)] = True
+    mask[0] = False  # pozițiile libere
+    return mask
+
+
+def hit_counts(rows, round_row, max_number):
+    # Câte numere din fiecare variantă au ieșit în rundă (o singură indexare vectorizată)
+    return draw_mask(round_row, max_number)[np.asarray(rows, dtype=np.int64)].sum(axis=1)
+
+
+def random_hit_distribution(max_number, draw_size, variant_size):
+    # Distribuția hipergeometrică a potrivirilor pentru o variantă aleatoare (referința de comparație)
+    total = comb(max_number, variant_size)
+    return np.array([
+        comb(draw_size, h) * comb(max_number - draw_size, variant_size - h) / total
+        for h in range(variant_size + 1)
+    ])
+
+
+@dataclass
+class BacktestResult:
+    variant_size: int
+    rounds_tested: int = 0
+    # strategie -> histograma potrivirilor (index = număr de potriviri) pe toate variantele testate
+    hits: dict = field(default_factory=dict)
+    # strategie -> media potrivirilor per rundă testată
+    mean_by_round: dict = field(default_factory=dict)
+
+    def distribution(self, strategy_key):
+        hist = self.hits[strategy_key]
+        return hist / max(hist.sum(), 1)
+
+    def mean_hits(self, strategy_key):
+        hist = self.hits[strategy_key]
+        return float((hist * np.arange(len(hist))).sum() / max(hist.sum(), 1))
+
+
+# --- Backtest walk-forward ---
+#
+# Pentru fiecare rundă testată t, analiza vede doar rundele [0, t) — agregatele sunt
+# actualizate incremental (IncrementalAnalysis), nu recalculate. Fiecare strategie
+# generează N variante unice în mod batch, iar potrivirile cu runda t se numără
+# vectorizat pe toată matricea de variante.
+def walk_forward(rounds, max_number, variant_size, strategies_to_use, num_variants=1000, start=None, step=1,
+                 top_count=50, exclude_numbers=frozenset(), exclude_cold=0, history_depth=50, use_triplets=False,
+                 rng=None, on_progress=None):
+    rounds = as_rounds_array(rounds, max_number)
+    rng = np.random.default_rng(rng)
+    start = min(BACKTEST_WARMUP, len(rounds) - 1) if start is None else start
+    if not 1 <= start < len(rounds):
+        raise ValueError(f"Backtest-ul are nevoie de cel puțin o rundă de istoric și una de testat (start={start}, runde={len(rounds)}).")
+
+    result = BacktestResult(variant_size)
+    for strategy_key in strategies_to_use:
+        result.hits[strategy_key] = np.zeros(variant_size + 1, dtype=np.int64)
+        result.mean_by_round[strategy_key] = []
+
+    incremental = IncrementalAnalysis(max_number)
+    incremental.append_rounds(rounds[:start])
+    test_rounds = range(start, len(rounds), step)
+    for i, t in enumerate(test_rounds):
+        ctx = incremental.context(variant_size if use_triplets else min(variant_size, 2))
+        excluded = set(exclude_numbers) | coldest_numbers(ctx.frequency, exclude_cold)
+        top_numbers = select_top_numbers(ctx.frequency, excluded, top_count)
+        if len(top_numbers) >= variant_size:
+            sctx = StrategyContext(ctx, top_numbers, variant_size, excluded, use_triplets, history_depth)
+            for strategy_key in strategies_to_use:
+                variants, _ = generate_variants_batch(sctx, [strategy_key], num_variants, rng=rng, batch_size=num_variants)
+                hits = hit_counts(variants.rows, rounds[t], max_number)
+                result.hits[strategy_key] += np.bincount(hits, minlength=variant_size + 1)
+                result.mean_by_round[strategy_key].append(float(hits.mean()) if len(hits) else 0.0)
+            result.rounds_tested += 1
+
+        incremental.append_rounds(rounds[t:t + step])
+        if on_progress is not None:
+            on_progress(i + 1, len(test_rounds))
+    return result
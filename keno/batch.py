@@ -0,0 +1,234 @@
+import time
+
+import numpy as np
+
+from .metrics import block_counts
+from .strategies import MIX_STRATEGIES
+from .variants import VariantStore
+
+# Încercări per bloc, cel mult: matricele temporare (n, max_num) ale unui bloc rămân de
+# ordinul zecilor de MB și la milioane de variante cerute; oprirea se verifică per bloc
+MAX_BLOCK_ATTEMPTS = 131072
+
+
+# --- Generare vectorizată (NumPy): fiecare strategie trage mii de variante odată ---
+#
+# Variantele sunt construite ca o matrice booleană (n, max_num) de numere alese.
+# O extragere "m din pool" dă fiecărui rând chei aleatoare pe coloanele din pool
+# (Gumbel + log(pondere) pentru extrageri ponderate fără repetiție) și păstrează
+# primele m chei; numerele deja alese sau din afara pool-ului primesc -inf.
+
+
+class BatchGenerator:
+    def __init__(self, sctx):
+        self.sctx = sctx
+        self.max_num = sctx.max_num
+        self.k = sctx.variant_size
+        self.top_nums = sctx.top_nums
+
+        numbers = np.arange(1, self.max_num + 1)
+        self.numbers = numbers
+        self.top_mask = self._mask(sctx.top_nums)
+        self.hot_half_mask = self._mask(sctx.hot_pool)
+        self.cold_half_mask = self._mask(sctx.cold_pool)
+        self.hot10_mask = self._mask(sctx.hot10_pool)
+        self.even_mask = self._mask(sctx.even_pool)
+        self.odd_mask = self._mask(sctx.odd_pool)
+        self.quadrant_masks = [self._mask(q) for q in sctx.quadrant_pools]
+        self.low_mask = self._mask(sctx.low_pool)
+        self.cold_candidates_mask = self._mask(sctx.cold_candidates)
+        self.aged_mask = self._mask(sctx.aged_pool)
+        self.mirror_masks = [self._mask(q) for q in sctx.mirror_pools]
+        self.repeat_mask = self._mask(sctx.repeat_pool)
+        self.strata = [self._mask(s) for s in sctx.strata] if sctx.strata is not None else None
+        self.neighbor_seeds = np.array(sctx.neighbor_seeds, dtype=np.int64)
+
+        self.freq_log_w = self._log_weights("frequency")
+        self.avg_sum_log_w = self._log_weights("average_sum")
+        history = sctx.sampler("history")
+        self.recent_mask = self._mask(history.population)
+        self.recent_log_w = self._log_weights("history")
+
+    def _mask(self, nums):
+        mask = np.zeros(self.max_num, dtype=bool)
+        idx = [n - 1 for n in nums if 1 <= n <= self.max_num]
+        mask[idx] = True
+        return mask
+
+    def _log_weights(self, key):
+        # ponderile samplerului din context, întinse pe tot domeniul 1..max_num
+        sampler = self.sctx.sampler(key)
+        log_w = np.full(self.max_num, -np.inf)
+        weights = np.asarray(sampler.weights, dtype=float)
+        with np.errstate(divide="ignore"):
+            log_w[np.asarray(sampler.population, dtype=np.int64) - 1] = np.log(weights)
+        return log_w
+
+    # --- Extragere vectorizată: m numere din pool pe fiecare rând ---
+    def _draw(self, rng, chosen, pool, m, log_w=None):
+        n = chosen.shape[0]
+        m = np.minimum(np.broadcast_to(np.asarray(m), (n,)), self.k - chosen.sum(axis=1))
+        if not m.any():
+            return chosen
+        if log_w is None:
+            keys = rng.random(chosen.shape)
+        else:
+            keys = rng.gumbel(size=chosen.shape) + log_w
+        keys[~np.broadcast_to(pool, chosen.shape) | chosen] = -np.inf
+        # pragul = a m-a cea mai mare cheie din rând; m <= k, deci ajunge o partiționare a primelor k
+        top = int(m.max())
+        largest = -np.partition(-keys, top - 1, axis=1)[:, :top]
+        largest.sort(axis=1)
+        threshold = largest[np.arange(n), top - np.maximum(m, 1)]
+        picked = (keys >= threshold[:, None]) & (m[:, None] > 0) & np.isfinite(keys)
+        return chosen | picked
+
+    def _fill(self, rng, chosen):
+        return self._draw(rng, chosen, self.top_mask, self.k)
+
+    def _fixed(self, rng, n, base):
+        chosen = np.zeros((n, self.max_num), dtype=bool)
+        if len(base) > self.k:
+            return self._draw(rng, chosen, self._mask(base), self.k)
+        chosen[:, [b - 1 for b in base]] = True
+        return chosen
+
+    def generate(self, strategy_key, n, rng):
+        chosen = self.generate_mask(strategy_key, n, rng)
+        return self.to_rows(chosen[chosen.sum(axis=1) == self.k])
+
+    def generate_mask(self, strategy_key, n, rng):
+        chosen = np.zeros((n, self.max_num), dtype=bool)
+        k = self.k
+        if n == 0 or len(self.top_nums) < k:
+            return chosen
+
+        if strategy_key == "weighted_frequency":
+            chosen = self._draw(rng, chosen, self.top_mask, k, self.freq_log_w)
+        elif strategy_key == "hot_numbers":
+            chosen = self._draw(rng, chosen, self.hot10_mask, min(3, k))
+            chosen = self._draw(rng, chosen, self.top_mask, k, self.freq_log_w)
+        elif strategy_key in ("cold_hot_hybrid", "hot_cold_ratio"):
+            num_hot = k // 2 if strategy_key == "cold_hot_hybrid" else int(k * 0.7)
+            chosen = self._draw(rng, chosen, self.hot_half_mask, num_hot)
+            chosen = self._draw(rng, chosen, self.cold_half_mask, k - num_hot)
+        elif strategy_key == "golden_pairs":
+            chosen = self._fixed(rng, n, self.sctx.base_combo)
+        elif strategy_key == "parity_balance":
+            chosen = self._draw(rng, chosen, self.even_mask, k // 2)
+            chosen = self._draw(rng, chosen, self.odd_mask, k - k // 2)
+        elif strategy_key == "quadrant_force":
+            quadrants = [q for q in self.quadrant_masks if q.any()]
+            nums_per_quad = max(1, k // len(quadrants)) if quadrants else 1
+            for q in quadrants:
+                chosen = self._draw(rng, chosen, q, nums_per_quad)
+        elif strategy_key == "return_age":
+            chosen = self._draw(rng, chosen, self.aged_mask, k // 2)
+        elif strategy_key == "consecutive_pair":
+            chosen = self._fixed(rng, n, self.sctx.consecutive_base)
+        elif strategy_key == "frequency_neighbors":
+            if len(self.neighbor_seeds):
+                seeds = rng.choice(self.neighbor_seeds, size=n)
+                chosen[np.arange(n), seeds - 1] = True
+                neighbors = self.top_mask[None, :] & (np.abs(self.numbers[None, :] - seeds[:, None]) <= 5) & ~chosen
+                chosen = self._draw(rng, chosen, neighbors, np.minimum(k // 2, neighbors.sum(axis=1)))
+        elif strategy_key == "cold_booster":
+            chosen = self._draw(rng, chosen, self.cold_candidates_mask, k // 3)
+        elif strategy_key == "average_sum_weighted":
+            chosen = self._draw(rng, chosen, self.top_mask, k, self.avg_sum_log_w)
+        elif strategy_key == "history_adherence":
+            chosen = self._draw(rng, chosen, self.recent_mask, k, self.recent_log_w)
+        elif strategy_key == "mix_strategy":
+            picks = rng.integers(len(MIX_STRATEGIES), size=n)
+            for i, strat in enumerate(MIX_STRATEGIES):
+                rows = np.flatnonzero(picks == i)
+                chosen[rows] = self.generate_mask(strat, len(rows), rng)
+            return chosen
+        elif strategy_key == "low_numbers_gravitation":
+            chosen = self._draw(rng, chosen, self.low_mask, k // 2)
+        elif strategy_key == "quadrant_mirroring":
+            for q in self.mirror_masks:
+                chosen = self._draw(rng, chosen, q, 1)
+        elif strategy_key == "forced_repetitions":
+            if self.sctx.avg_reps > 0:
+                chosen = self._draw(rng, chosen, self.repeat_mask, min(self.sctx.avg_reps, k))
+        elif strategy_key == "stratified_mix":
+            if self.strata is None:
+                chosen = self._draw(rng, chosen, self.top_mask, k, self.freq_log_w)
+            else:
+                for s in self.strata:
+                    chosen = self._draw(rng, chosen, s, 1)
+
+        return self._fill(rng, chosen)
+
+    def to_rows(self, chosen):
+        return (np.nonzero(chosen)[1].reshape(-1, self.k) + 1).astype(np.int64)
+
+
+def batch_candidates(generator, strategies_to_use, attempt_ids, rng, seconds=None, strategy_idx=None):
+    # Aceeași rotație a strategiilor ca în bucla scalară: încercarea a folosește strategies[a % S],
+    # dacă planificatorul nu a dat strategy_idx (strategia fiecărei încercări din bloc).
+    # Întoarce rândurile complete și încercările din care provin; `seconds` adună timpul per strategie.
+    size = len(attempt_ids)
+    if strategy_idx is None:
+        strategy_idx = attempt_ids % len(strategies_to_use)
+    rows = np.zeros((size, generator.k), dtype=np.int64)
+    valid = np.zeros(size, dtype=bool)
+    for i, strategy_key in enumerate(strategies_to_use):
+        start = time.perf_counter()
+        slots = np.flatnonzero(strategy_idx == i)
+        if not len(slots):
+            continue
+        chosen = generator.generate_mask(strategy_key, len(slots), rng)
+        ok = chosen.sum(axis=1) == generator.k
+        rows[slots[ok]] = generator.to_rows(chosen[ok])
+        valid[slots[ok]] = True
+        if seconds is not None:
+            seconds[i] += time.perf_counter() - start
+    return rows[valid], attempt_ids[valid]
+
+
+# --- Bucla principală în mod batch (deduplicare în bloc) ---
+def generate_variants_batch(sctx, strategies_to_use, num_variants, on_progress=None, rng=None, batch_size=4096,
+                            metrics=None, scheduler=None, cancel=None, variants=None):
+    started = time.perf_counter()
+    rng = np.random.default_rng(rng)
+    generator = BatchGenerator(sctx)
+    max_attempts = num_variants * 100
+    attempts = 0
+
+    if variants is None:
+        variants = VariantStore(sctx.max_num, sctx.variant_size)
+    while len(variants) < num_variants and attempts < max_attempts:
+        if cancel is not None and cancel.is_set():
+            break
+        if scheduler is not None and scheduler.exhausted:
+            break  # toate strategiile retrase sau excluse (proporție 0): allocate() ar fi gol
+        remaining = num_variants - len(variants)
+        size = min(max(2 * remaining, batch_size), max_attempts - attempts, MAX_BLOCK_ATTEMPTS)
+        if scheduler is not None:
+            # blocuri de cel mult batch_size, ca alocarea să urmeze randamentul pe parcurs
+            size = min(size, batch_size)
+
+        attempt_ids = np.arange(attempts + 1, attempts + size + 1)
+        strategy_idx = scheduler.allocate(size) if scheduler is not None else None
+        seconds = np.zeros(len(strategies_to_use)) if metrics is not None else None
+        rows, cand_attempts = batch_candidates(generator, strategies_to_use, attempt_ids, rng, seconds, strategy_idx)
+        fresh = variants.add_rows(rows, limit=remaining)
+
+        first_attempt = attempts
+        if len(fresh) == remaining:
+            attempts = int(cand_attempts[fresh[-1]])
+        else:
+            attempts += size
+        counts = block_counts(len(strategies_to_use), first_attempt, attempts, cand_attempts, fresh, strategy_idx)
+        if metrics is not None:
+            metrics.count_block(counts, seconds)
+        if on_progress is not None:
+            on_progress(len(variants), attempts)
+        if scheduler is not None:
+            scheduler.update(counts[0], counts[2])
+
+    if metrics is not None:
+        metrics.wall_seconds += time.perf_counter() - started
+    return variants.shuffle(rng), attempts
@@ -0,0 +1,189 @@
+import argparse
+from datetime import datetime, timezone
+from functools import partial
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from .analysis import (
+    analyze_cold_streak,
+    analyze_history,
+    analyze_pairs_triplets,
+    analyze_repetitions,
+    proceseaza_runde,
+    select_top_numbers,
+)
+from .context import StrategyContext
+from .parser import rounds_dtype
+from .stats import compute_variant_stats
+from .strategies import ALL_STRATEGIES, generate_variant_by_strategy
+
+BENCH_ROUNDS = (1000, 10_000, 100_000)
+BENCH_MAX_NUMBERS = (80, 90)
+BENCH_SIZES = tuple(range(2, 10))
+BENCH_DRAW_SIZE = 20
+BENCH_TOP_COUNT = 50
+# Câte variante primesc statisticile Secțiunii 4
+BENCH_STATS_VARIANTS = 10_000
+
+# O măsurătoare repetă apelul până durează cel puțin atât; se păstrează cea mai bună din BENCH_REPEAT
+MIN_MEASURE_SECONDS = 0.05
+BENCH_REPEAT = 3
+
+# Peste acest raport (timp curent / timp de referință) un caz e raportat ca regresie
+REGRESSION_TOLERANCE = 1.2
+
+
+def synthetic_history(num_rounds, max_number, draw_size=BENCH_DRAW_SIZE, rng=None):
+    # Runde Keno uniforme: draw_size numere distincte din 1..max_number, sortate
+    rng = np.random.default_rng(rng)
+    draws = np.argpartition(rng.random((num_rounds, max_number)), draw_size - 1, axis=1)[:, :draw_size] + 1
+    return np.sort(draws, axis=1).astype(rounds_dtype(max_number))
+
+
+def measure(fn, repeat=BENCH_REPEAT, min_seconds=MIN_MEASURE_SECONDS):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+        number *= 2 if elapsed > min_seconds / 4 else 10
+    times = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append(time.perf_counter() - start)
+    per_call = sorted(t / number for t in times)
+    return {"best": per_call[0], "median": per_call[len(per_call) // 2], "calls": number, "repeat": repeat}
+
+
+def case_id(name, params):
+    return name + "[" + ",".join(f"{key}={value}" for key, value in sorted(params.items())) + "]"
+
+
+# --- Cazurile: analiza pe istoric, fiecare strategie și statisticile Secțiunii 4 ---
+def iter_cases(rounds_counts=BENCH_ROUNDS, max_numbers=BENCH_MAX_NUMBERS, sizes=BENCH_SIZES, seed=0):
+    # Generează (nume, parametri, funcție); istoricul și contextul se construiesc o dată per combinație
+    for num_rounds in rounds_counts:
+        for max_number in max_numbers:
+            rounds = synthetic_history(num_rounds, max_number, rng=(seed, num_rounds, max_number))
+            lines = [",".join(map(str, row)) for row in rounds.tolist()]
+            base = {"rounds": num_rounds, "max_number": max_number}
+
+            yield "analyze_cold_streak", base, partial(analyze_cold_streak, rounds, max_number)
+            yield "analyze_repetitions", base, partial(analyze_repetitions, rounds, max_number)
+            # perechile/tripletele depind de k doar prin k >= 3
+            for k in sorted({min(k, 3) for k in sizes}):
+                params = dict(base, k=k)
+                yield "analyze_pairs_triplets", params, partial(analyze_pairs_triplets, rounds, k, max_number)
+                yield "proceseaza_runde", params, partial(proceseaza_runde, lines, k, max_number)
+
+            ctx = analyze_history(rounds, 3, max_number)
+            top_numbers = select_top_numbers(ctx.frequency, set(), BENCH_TOP_COUNT)
+            for k in sizes:
+                params = dict(base, k=k)
+                sctx = StrategyContext(ctx, top_numbers, k)
+                for key in ALL_STRATEGIES.values():
+                    yield f"strategy:{key}", params, partial(generate_variant_by_strategy, key, sctx)
+
+    # statisticile Secțiunii 4 depind doar de variante, nu de istoric
+    for max_number in max_numbers:
+        for k in sizes:
+            rows = synthetic_history(BENCH_STATS_VARIANTS, max_number, k, rng=(seed, max_number, k))
+            params = {"max_number": max_number, "k": k, "variants": BENCH_STATS_VARIANTS}
+            yield "variant_stats", params, partial(compute_variant_stats, rows, max_number)
+
+
+def run_benchmarks(rounds_counts=BENCH_ROUNDS, max_numbers=BENCH_MAX_NUMBERS, sizes=BENCH_SIZES, only=None,
+                   seed=0, on_result=None):
+    results = []
+    for name, params, fn in iter_cases(rounds_counts, max_numbers, sizes, seed):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        random.seed(seed)  # strategiile folosesc modulul global random
+        result = dict(name=name, params=params, **measure(fn))
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    # Întoarce [(id, referință, curent, raport)] pentru cazurile comune, cele mai lente primele
+    reference = {case_id(r["name"], r["params"]): r["best"] for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = case_id(r["name"], r["params"])
+        if key in reference and reference[key] > 0:
+            rows.append((key, reference[key], r["best"], r["best"] / reference[key]))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    regressions = [row for row in rows if row[3] > tolerance]
+    return rows, regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m keno.bench",
+        description="Benchmark-uri pe istorice Keno sintetice: strategii, analiză și statistici, cu ieșire JSON.",
+    )
+    parser.add_argument("--rounds", type=int, nargs="+", default=list(BENCH_ROUNDS), help="Numărul de runde ale istoricului")
+    parser.add_argument("--max-numbers", type=int, nargs="+", default=list(BENCH_MAX_NUMBERS), help="Numărul maxim al loteriei")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCH_SIZES), help="Mărimile variantei (k)")
+    parser.add_argument("--only", action="append", help="Doar cazurile al căror nume conține textul (poate fi repetat)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed pentru istoricele sintetice și strategii")
+    parser.add_argument("-o", "--output", default="-", help="Fișierul JSON cu rezultatele ('-' = stdout)")
+    parser.add_argument("--baseline", help="Fișier JSON salvat anterior; raportează raportul de timp per caz")
+    parser.add_argument(
+        "--tolerance", type=float, default=REGRESSION_TOLERANCE,
+        help="Raportul peste care un caz e regresie (cod de ieșire 1)",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    def on_result(result):
+        print(f"{case_id(result['name'], result['params'])}\t{result['best'] * 1e6:.1f} µs", file=sys.stderr)
+
+    current = run_benchmarks(args.rounds, args.max_numbers, args.sizes, args.only, args.seed, on_result)
+    text = json.dumps(current, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows, regressions = compare_results(current, baseline, args.tolerance)
+    print("caz\treferință (µs)\tcurent (µs)\traport", file=sys.stderr)
+    for key, ref, cur, ratio in rows:
+        print(f"{key}\t{ref * 1e6:.1f}\t{cur * 1e6:.1f}\t{ratio:.2f}", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} regresii peste {args.tolerance:.2f}x.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
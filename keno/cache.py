@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+
+import numpy as np
+
+
+def content_key(data, max_number, variant_size):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest(), max_number, variant_size
+
+
+def estimate_context_bytes(ctx):
+    # Estimare grosieră: matricea de runde + dicționarele de frecvențe + tablourile NumPy
+    # (un istoric deschis prin mmap stă în cache-ul OS, nu în memoria procesului)
+    size = 0 if isinstance(ctx.historic_rounds, np.memmap) else ctx.historic_rounds.nbytes
+    for d in (ctx.frequency, ctx.pair_frequency, ctx.triplet_frequency):
+        size += sys.getsizeof(d) + 64 * len(d)
+    if isinstance(ctx.last_seen, np.ndarray):
+        size += ctx.last_seen.nbytes
+    return size
+
+
+# --- Cache LRU cu buget de memorie pentru rezultatele parse -> analiză ---
+#
+# Cheia este hash-ul conținutului fișierului + max_number + mărimea variantei, deci
+# rerulările pe același set de date nu mai parsează și nu mai analizează nimic.
+# Când bugetul este depășit se elimină intrările folosite cel mai demult.
+class AnalysisCache:
+    def __init__(self, max_bytes, sizeof=estimate_context_bytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
@@ -0,0 +1,265 @@
+import argparse
+import json
+import random
+import sys
+
+from .analysis import (
+    RoundParseError,
+    analyze_history,
+    coldest_numbers,
+    select_top_numbers,
+)
+from .backtest import random_hit_distribution, walk_forward
+from .batch import generate_variants_batch
+from .constrained import VariantConstraints, generate_constrained_variants
+from .context import StrategyContext
+from .export import EXPORT_FORMATS, available_formats, format_from_path, write_export
+from .generation import (
+    covers_feasible_space,
+    feasible_space,
+    generate_variants,
+    generate_variants_exhaustive,
+    should_enumerate,
+)
+from .metrics import GenerationMetrics, RunProfile
+from .parallel import generate_variants_parallel
+from .parser import parse_rounds_bytes
+from .scheduler import AdaptiveScheduler
+from .store import HistoryStoreError, is_history_store, open_history, write_history
+from .strategies import ALL_STRATEGIES
+from .wheel import generate_covering_variants
+
+
+def _interval(text):
+    # "MIN:MAX" -> (MIN, MAX), pentru constrângerile exacte
+    lo, sep, hi = text.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"interval invalid '{text}' (format MIN:MAX)")
+    return int(lo), int(hi)
+
+
+def _quadrant_quotas(text):
+    quotas = tuple(_interval(part) for part in text.split(","))
+    if len(quotas) != 4:
+        raise argparse.ArgumentTypeError("sunt necesare 4 intervale, câte unul per cadran (ex: 1:2,1:2,0:2,1:2)")
+    return quotas
+
+
+def _share(text):
+    # "STRATEGIE=PONDERE" -> (strategie, pondere), pentru proporțiile țintă ale planificatorului
+    key, sep, weight = text.partition("=")
+    if not sep or key not in ALL_STRATEGIES.values():
+        raise argparse.ArgumentTypeError(f"proporție invalidă '{text}' (format STRATEGIE=PONDERE)")
+    return key, float(weight)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m keno",
+        description="Generator Variante Keno - rulare fără interfață (istoric in, variante out).",
+    )
+    parser.add_argument(
+        "history",
+        help="Fișier CSV/TXT cu extragerile (o rundă pe linie, numere separate cu virgulă) sau istoric binar .khst",
+    )
+    parser.add_argument("-o", "--output", default="-", help="Fișierul de ieșire pentru variante ('-' = stdout)")
+    parser.add_argument("--max-number", type=int, default=80, help="Numărul maxim al loteriei (ex: 80, 90)")
+    parser.add_argument("-k", "--variant-size", type=int, default=4, help="Mărimea variantei (k/k)")
+    parser.add_argument("-n", "--num-variants", type=int, default=1000, help="Câte variante unice să generezi")
+    parser.add_argument("--top", type=int, default=50, help="Câte numere fierbinți să păstrezi (Top N)")
+    parser.add_argument("--exclude", default="", help="Numere de exclus manual (separate cu virgulă)")
+    parser.add_argument("--exclude-cold", type=int, default=0, help="Exclude topul celor mai reci N numere")
+    parser.add_argument("--history-depth", type=int, default=50, help="Adâncimea istoriei pentru 'history_adherence'")
+    parser.add_argument("--triplets", action="store_true", help="Folosește triplete în loc de perechi ca bază combinatorie")
+    parser.add_argument(
+        "-s", "--strategy", action="append", dest="strategies", choices=sorted(ALL_STRATEGIES.values()),
+        help="Strategie de generare (poate fi repetată; implicit: standard)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed pentru generatorul aleator")
+    parser.add_argument("--batch", action="store_true", help="Generare vectorizată NumPy (mii de variante per strategie odată)")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="Procese paralele pentru generare (0 = toate nucleele); rezultatul depinde doar de --seed",
+    )
+    parser.add_argument(
+        "--cover", type=int, metavar="T", default=None,
+        help="Sistem de acoperire: variante care acoperă toate T-subseturile din Top N (maximum -n variante)",
+    )
+    parser.add_argument(
+        "--backtest", type=int, metavar="ROUNDS", default=None,
+        help="Backtest walk-forward pe ultimele ROUNDS runde (-n variante per strategie per rundă), în loc de generare",
+    )
+    parser.add_argument("--sum", type=_interval, metavar="MIN:MAX", help="Constrângere exactă: suma variantei")
+    parser.add_argument("--evens", type=_interval, metavar="MIN:MAX", help="Constrângere exactă: câte numere pare")
+    parser.add_argument("--numbers", type=_interval, metavar="MIN:MAX", help="Constrângere exactă: toate numerele în interval")
+    parser.add_argument(
+        "--quadrants", type=_quadrant_quotas, metavar="Q1,Q2,Q3,Q4",
+        help="Constrângere exactă: câte numere per cadran, ca intervale MIN:MAX separate prin virgulă",
+    )
+    parser.add_argument(
+        "--weighted", action="store_true",
+        help="Cu constrângeri exacte: variante ponderate cu frecvența numerelor, nu uniforme",
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="Împarte încercările între strategii după randamentul recent și retrage strategiile epuizate",
+    )
+    parser.add_argument(
+        "--share", type=_share, action="append", metavar="STRATEGIE=PONDERE",
+        help="Cu --adaptive: proporția țintă a unei strategii (implicit 1; poate fi repetat)",
+    )
+    parser.add_argument("--no-id", action="store_true", help="Exportă doar numerele, fără ID")
+    parser.add_argument(
+        "--format", choices=list(EXPORT_FORMATS), default=None,
+        help="Formatul exportului (implicit după extensia fișierului de ieșire: .txt.gz, .txt.zst, .npy, .parquet)",
+    )
+    parser.add_argument("--save-store", metavar="PATH", help="Salvează istoricul parsat ca fișier binar .khst (mmap)")
+    parser.add_argument(
+        "--metrics", metavar="PATH",
+        help="Scrie metricile per strategie (timp, încercări, acceptate, duplicate, incomplete) ca JSON",
+    )
+    parser.add_argument("--profile", action="store_true", help="Profilează generarea cu cProfile (raport pe stderr)")
+    parser.add_argument("--trace-memory", action="store_true", help="Urmărește alocările generării cu tracemalloc (raport pe stderr)")
+    return parser
+
+
+def _generate(sctx, strategies, args, metrics=None, scheduler=None):
+    space = feasible_space(sctx, strategies)
+    if args.num_variants > space:
+        bound = "doar" if covers_feasible_space(strategies) else "cel mult"
+        print(f"Există {bound} {space} combinații posibile; cererea de {args.num_variants} nu poate fi satisfăcută integral.", file=sys.stderr)
+    if should_enumerate(sctx, strategies, args.num_variants):
+        return generate_variants_exhaustive(sctx, strategies, args.num_variants, rng=args.seed)
+    if args.workers != 1:
+        return generate_variants_parallel(
+            sctx, strategies, args.num_variants, seed=args.seed, workers=args.workers or None, batch=args.batch,
+            metrics=metrics, scheduler=scheduler,
+        )
+    if args.batch:
+        return generate_variants_batch(
+            sctx, strategies, args.num_variants, rng=args.seed, metrics=metrics, scheduler=scheduler,
+        )
+    return generate_variants(sctx, strategies, args.num_variants, metrics=metrics, scheduler=scheduler)
+
+
+def _run_generation(sctx, strategies, args, metrics, scheduler=None):
+    # Alege modul de generare; erorile de configurare ajung ca ValueError
+    if args.cover is not None:
+        variants, coverage = generate_covering_variants(sctx, args.cover, args.num_variants, rng=args.seed)
+        print(f"Acoperire {args.cover} din {args.variant_size}: {coverage:.1%} din {args.cover}-subseturi.", file=sys.stderr)
+        return variants, len(variants)
+    if any(v is not None for v in (args.sum, args.evens, args.numbers, args.quadrants)):
+        # extragere exactă: fiecare variantă respectă constrângerile, strategiile nu se aplică
+        constraints = VariantConstraints(args.sum, args.evens, args.numbers, args.quadrants)
+        return generate_constrained_variants(sctx, constraints, args.num_variants, weighted=args.weighted, rng=args.seed)
+    return _generate(sctx, strategies, args, metrics, scheduler)
+
+
+def _report_metrics(metrics, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics.to_dict(), f, indent=2)
+    print("strategie\ttimp (s)\tîncercări\tacceptate\tduplicate\tincomplete\trandament", file=sys.stderr)
+    for r in metrics.records():
+        print(f"{r['strategy']}\t{r['seconds']:.3f}\t{r['attempts']}\t{r['accepted']}\t{r['duplicates']}\t"
+              f"{r['invalid']}\t{r['yield']:.3f}", file=sys.stderr)
+
+
+def _backtest(rounds, exclude_numbers, use_triplets, args):
+    strategies = args.strategies or ["standard"]
+    try:
+        result = walk_forward(
+            rounds, args.max_number, args.variant_size, strategies, num_variants=args.num_variants,
+            start=len(rounds) - args.backtest, top_count=args.top, exclude_numbers=exclude_numbers,
+            exclude_cold=args.exclude_cold, history_depth=args.history_depth, use_triplets=use_triplets, rng=args.seed,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    k = args.variant_size
+    out = sys.stdout
+    out.write("strategie\tmedie\t" + "\t".join(f"{h}/{k}" for h in range(k + 1)) + "\n")
+    for key in strategies:
+        dist = result.distribution(key)
+        out.write(f"{key}\t{result.mean_hits(key):.4f}\t" + "\t".join(f"{p:.4f}" for p in dist) + "\n")
+    baseline = random_hit_distribution(args.max_number, int((rounds[-1] > 0).sum()), k)
+    mean = float((baseline * range(k + 1)).sum())
+    out.write(f"aleatoriu\t{mean:.4f}\t" + "\t".join(f"{p:.4f}" for p in baseline) + "\n")
+    print(f"Testate {result.rounds_tested} runde.", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    export_format = args.format or format_from_path(args.output)
+    if export_format not in available_formats():
+        print(f"Formatul '{export_format}' nu este disponibil (lipsește pachetul opțional).", file=sys.stderr)
+        return 2
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    try:
+        if is_history_store(args.history):
+            # istoricul binar își poartă propriul max_number și se citește prin mmap
+            rounds, args.max_number = open_history(args.history)
+        else:
+            with open(args.history, "rb") as f:
+                rounds = parse_rounds_bytes(f.read(), args.max_number)
+        ctx = analyze_history(rounds, args.variant_size, args.max_number)
+    except (RoundParseError, HistoryStoreError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.save_store and ctx is not None:
+        write_history(args.save_store, ctx.historic_rounds, args.max_number)
+    if ctx is None:
+        print("Fișierul de istoric nu conține nicio rundă.", file=sys.stderr)
+        return 1
+
+    try:
+        exclude_numbers = set(int(x.strip()) for x in args.exclude.split(",") if x.strip())
+    except ValueError:
+        print("--exclude: introduceți numere întregi valide separate prin virgulă.", file=sys.stderr)
+        return 2
+    use_triplets = args.triplets and args.variant_size >= 3
+    if args.backtest is not None:
+        # cele mai reci numere se recalculează la fiecare rundă, doar din trecutul ei
+        return _backtest(rounds, exclude_numbers, use_triplets, args)
+    exclude_numbers.update(coldest_numbers(ctx.frequency, args.exclude_cold))
+
+    top_numbers = select_top_numbers(ctx.frequency, exclude_numbers, args.top)
+    if args.variant_size > len(top_numbers):
+        print(f"Mărimea variantei ({args.variant_size}) este mai mare decât numerele disponibile ({len(top_numbers)}).", file=sys.stderr)
+        return 1
+
+    sctx = StrategyContext(ctx, top_numbers, args.variant_size, exclude_numbers, use_triplets, args.history_depth)
+    strategies = args.strategies or ["standard"]
+    metrics = GenerationMetrics(strategies) if args.metrics else None
+    scheduler = AdaptiveScheduler(strategies, dict(args.share or ())) if args.adaptive else None
+    try:
+        with RunProfile(cpu=args.profile, memory=args.trace_memory) as profile:
+            variants, attempts = _run_generation(sctx, strategies, args, metrics, scheduler)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.profile:
+        print(profile.cpu_report, file=sys.stderr)
+    if args.trace_memory:
+        print(profile.memory_report, file=sys.stderr)
+    if metrics is not None:
+        _report_metrics(metrics, args.metrics)
+    if scheduler is not None and scheduler.excluded_strategies():
+        print(f"Strategii excluse (proporție 0): {', '.join(scheduler.excluded_strategies())}.", file=sys.stderr)
+    if scheduler is not None and scheduler.retired_strategies():
+        print(f"Strategii retrase (fără variante noi): {', '.join(scheduler.retired_strategies())}.", file=sys.stderr)
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        write_export(out, variants.rows, export_format, with_id=not args.no_id)
+    finally:
+        if out is sys.stdout.buffer:
+            out.flush()
+        else:
+            out.close()
+
+    print(f"Generate {len(variants)}/{args.num_variants} variante în {attempts} încercări.", file=sys.stderr)
+    return 0
@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+import random
+
+import numpy as np
+
+from .stats import quadrant_of
+from .variants import VariantStore
+
+# Peste acest număr de celule tabelele DP (câte una per număr din pool) ocupă prea multă memorie
+MAX_DP_CELLS = 32_000_000
+
+# Câte variante se extrag odată, vectorizat, din tabelele DP
+CONSTRAINED_BATCH = 4096
+
+
+@dataclass(frozen=True)
+class VariantConstraints:
+    # Intervale inclusive (minim, maxim); None = fără constrângere
+    sum_range: tuple = None
+    even_range: tuple = None
+    # toate numerele variantei în [minim, maxim]
+    number_range: tuple = None
+    # 4 intervale: câte numere din Q1..Q4 are varianta
+    quadrant_quotas: tuple = None
+
+
+def _block_counter(lo, hi, variant_size):
+    # Contorul numerelor alese în cadranul curent: fără contor dacă nu există cotă,
+    # saturat la `lo` dacă doar minimul contează, altfel exact până la `hi`.
+    # Întoarce (tranziția la includere per stare, -1 = interzis; stările finale valide)
+    if hi >= variant_size:
+        size = lo + 1
+        include_to = np.minimum(np.arange(size) + 1, lo)
+    else:
+        size = hi + 1
+        include_to = np.arange(1, size + 1)
+        include_to[include_to > hi] = -1
+    valid = (np.arange(size) >= lo) & (np.arange(size) <= hi)
+    return include_to, valid
+
+
+# --- Extragere exactă sub constrângeri (sumă, pare, interval, cote pe cadrane) ---
+#
+# Numerele din pool sunt parcurse crescător, deci cadranele sunt blocuri contigue.
+# De la dreapta la stânga se construiește, pentru fiecare număr, tabelul H[c, s, e, q]
+# = ponderea totală a completărilor cu exact c numere, sumă s și e pare din numerele
+# rămase, dat fiind că în cadranul curent s-au ales deja q numere (cota se verifică
+# la ieșirea din cadran). O extragere alege întâi suma și numărul de pare finale
+# proporțional cu tabelul rădăcinii, apoi decide fiecare număr în ordine cu
+# probabilitatea exactă include / (include + exclude), deci orice variantă extrasă
+# respectă constrângerile și nu există buclă cu respingere.
+class ConstrainedSampler:
+    def __init__(self, pool, variant_size, max_number, constraints=VariantConstraints(), weights=None):
+        k = variant_size
+        pool = np.asarray(pool, dtype=np.int64)
+        weights = np.ones(len(pool)) if weights is None else np.asarray(weights, dtype=np.float64)
+        order = np.argsort(pool)
+        pool, weights = pool[order], weights[order]
+        if constraints.number_range is not None:
+            lo, hi = constraints.number_range
+            keep = (pool >= lo) & (pool <= hi)
+            pool, weights = pool[keep], weights[keep]
+        # ponderi normalizate (maxim 1), ca produsele pe k numere să nu depășească float64
+        weights = weights / weights.max() if len(weights) else weights
+
+        self.pool = pool
+        self.weights = weights
+        self.variant_size = k
+        self.max_number = max_number
+        self.sum_lo, self.sum_hi = constraints.sum_range or (0, k * max_number)
+        self.sum_hi = min(self.sum_hi, int(pool[-k:].sum()) if len(pool) >= k else 0)
+        self.even_lo, self.even_hi = constraints.even_range or (0, k)
+        self.even_hi = min(self.even_hi, k)
+        quotas = constraints.quadrant_quotas or ((0, k),) * 4
+
+        blocks = quadrant_of(pool, max_number)
+        counters = [_block_counter(lo, min(hi, k), k) for lo, hi in quotas]
+        shape = (k + 1, self.sum_hi + 1, k + 1)
+        cells = sum((np.count_nonzero(blocks == q) + 1) * len(counters[q][1]) for q in range(4)) * np.prod(shape)
+        if cells > MAX_DP_CELLS:
+            raise ValueError(f"Constrângerile cer tabele DP prea mari ({cells} celule); "
+                             "restrângeți suma maximă sau cotele pe cadrane.")
+
+        # next_tables[i] = tabelul numerelor de după i, văzut din cadranul lui i
+        self.next_tables = [None] * len(pool)
+        self.include_to = [counters[q][0] for q in blocks]
+        after = np.zeros(shape)
+        after[0, 0, 0] = 1.0
+        for q in range(3, -1, -1):
+            include_to, valid = counters[q]
+            table = after[..., None] * valid
+            cb_from = np.flatnonzero(include_to >= 0)
+            for i in np.flatnonzero(blocks == q)[::-1]:
+                self.next_tables[i] = table
+                v, ev = int(pool[i]), int(pool[i] % 2 == 0)
+                new = table.copy()
+                if v <= self.sum_hi:
+                    new[1:, v:, ev:][..., cb_from] += weights[i] * table[:-1, :self.sum_hi + 1 - v, :k + 1 - ev][..., include_to[cb_from]]
+                table = new
+            after = table[..., 0]
+        self.root = after[k]
+
+    @property
+    def total_weight(self):
+        # cu ponderi uniforme: exact numărul de variante care respectă constrângerile
+        return float(self.root[self.sum_lo:self.sum_hi + 1, self.even_lo:self.even_hi + 1].sum())
+
+    def sample(self, m, rng=None):
+        rng = np.random.default_rng(rng)
+        k = self.variant_size
+        targets = np.zeros_like(self.root)
+        targets[self.sum_lo:self.sum_hi + 1, self.even_lo:self.even_hi + 1] = \
+            self.root[self.sum_lo:self.sum_hi + 1, self.even_lo:self.even_hi + 1]
+        total = targets.sum()
+        if not m or total <= 0:
+            return np.zeros((0, k), dtype=np.int64)
+
+        flat = np.searchsorted(np.cumsum(targets.ravel()), rng.random(m) * total, side="right")
+        flat = np.minimum(flat, targets.size - 1)
+        s, e = np.divmod(flat, targets.shape[1])
+        c = np.full(m, k)
+        cb = np.zeros(m, dtype=np.int64)
+        rows = np.zeros((m, k), dtype=np.int64)
+        blocks = quadrant_of(self.pool, self.max_number)
+        for i, v in enumerate(self.pool.tolist()):
+            table = self.next_tables[i]
+            ev = int(v % 2 == 0)
+            cb_next = self.include_to[i][cb]
+            can = (c >= 1) & (s >= v) & (e >= ev) & (cb_next >= 0)
+            include = np.zeros(m)
+            include[can] = self.weights[i] * table[c[can] - 1, s[can] - v, e[can] - ev, cb_next[can]]
+            exclude = table[c, s, e, cb]
+            take = rng.random(m) * (include + exclude) < include
+            rows[take, k - c[take]] = v
+            c -= take
+            s -= v * take
+            e -= ev * take
+            cb = np.where(take, cb_next, cb)
+            if i + 1 == len(self.pool) or blocks[i + 1] != blocks[i]:
+                cb[:] = 0
+        return rows
+
+
+def generate_constrained_variants(sctx, constraints, num_variants, weighted=False, rng=None, on_progress=None,
+                                  cancel=None, variants=None):
+    # Variante unice din Top N care respectă exact constrângerile; uniform sau ponderat cu frecvența
+    weights = [sctx.frequency.get(n, 1) for n in sctx.top_nums] if weighted else None
+    sampler = ConstrainedSampler(sctx.top_nums, sctx.variant_size, sctx.max_num, constraints, weights)
+    if variants is None:
+        variants = VariantStore(sctx.max_num, sctx.variant_size)
+    if sampler.total_weight <= 0:
+        return variants, 0
+
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    target = num_variants if weighted else min(num_variants, round(sampler.total_weight))
+    max_attempts = num_variants * 100
+    attempts = 0
+    while len(variants) < target and attempts < max_attempts:
+        if cancel is not None and cancel.is_set():
+            break
+        m = min(CONSTRAINED_BATCH, max_attempts - attempts, max(2 * (target - len(variants)), 64))
+        variants.add_rows(sampler.sample(m, rng), limit=target - len(variants))
+        attempts += m
+        if on_progress is not None:
+            on_progress(len(variants), attempts)
+    return variants.shuffle(rng), attempts
@@ -0,0 +1,120 @@
+import numpy as np
+
+from .analysis import select_cold_candidates
+from .parser import round_numbers
+from .sampling import WeightedSampler
+
+
+# --- Context pre-calculat o singură dată per rulare de generare ---
+#
+# Toate pool-urile folosite de strategii (paritate, cadrane, jumătăți hot/cold,
+# numere joase, bazele combinatorii etc.) sunt invariante pe durata unei rulări,
+# deci sunt construite aici o dată, ca liste (pentru random.sample) și seturi
+# (pentru verificări de apartenență în O(1)).
+class StrategyContext:
+    def __init__(self, ctx, top_nums, variant_size, exclude_numbers=frozenset(), use_triplets=False,
+                 history_depth=50, cold_data=None):
+        self.analysis = ctx
+        self.max_num = ctx.max_number
+        self.variant_size = variant_size
+        self.top_nums = list(top_nums)
+        self.top_set = frozenset(self.top_nums)
+        self.exclude_numbers = frozenset(exclude_numbers)
+        self.use_triplets = use_triplets
+        self.history_depth = history_depth
+        self.frequency = ctx.frequency
+        self.sorted_freq_keys = list(ctx.frequency.keys())
+        self.historic_rounds = ctx.historic_rounds
+        self.avg_reps = ctx.avg_reps
+
+        if cold_data is None:
+            cold_data = ctx.cold_data
+        self.cold_data = cold_data
+        self.cold_candidates = select_cold_candidates(cold_data, self.top_set, self.exclude_numbers)
+
+        top_nums = self.top_nums
+        max_num = self.max_num
+
+        half = len(top_nums) // 2
+        self.hot_pool = top_nums[:half]
+        self.cold_pool = top_nums[half:]
+        self.hot10_pool = top_nums[:min(10, len(top_nums))]
+
+        self.even_pool = [n for n in top_nums if n % 2 == 0]
+        self.odd_pool = [n for n in top_nums if n % 2 == 1]
+
+        self.quadrant_pools = [[n for n in top_nums if self.quadrant(n) == q] for q in (1, 2, 3, 4)]
+        self.low_pool = [n for n in top_nums if n <= max_num // 3]
+
+        aged_nums = sorted(cold_data.items(), key=lambda x: x[1], reverse=True)
+        self.aged_pool = [n for n, age in aged_nums if n in self.top_set and age > 5][:variant_size]
+
+        # Baza combinatorie: doar prima cheie, fără a materializa tot dicționarul
+        self.base_combo = []
+        if use_triplets and ctx.triplet_frequency and variant_size >= 3:
+            self.base_combo = list(next(iter(ctx.triplet_frequency)))
+        elif ctx.pair_frequency:
+            self.base_combo = list(next(iter(ctx.pair_frequency)))
+
+        self.consecutive_base = []
+        for i, n in enumerate(top_nums[:-1]):
+            if top_nums[i+1] == n + 1:
+                self.consecutive_base = [n, n + 1]
+                break
+
+        self.neighbor_seeds = self.sorted_freq_keys[:20]
+        self.neighbors = {
+            seed: [n for n in top_nums if abs(n - seed) <= 5 and n != seed]
+            for seed in self.neighbor_seeds
+        }
+
+        self.mirror_pools = []
+        self.repeat_pool = []
+        if len(ctx.historic_rounds):
+            last_round = round_numbers(ctx.historic_rounds[-1]).tolist()
+            last_quadrants = sorted(set(self.quadrant(n) for n in last_round))
+            self.mirror_pools = [self.quadrant_pools[q - 1] for q in last_quadrants]
+            self.repeat_pool = [n for n in set(last_round) if n in self.top_set]
+
+        # Stratificată: doar pentru 4/4 și minim 25 de numere cu frecvență
+        self.strata = None
+        if variant_size == 4 and len(self.sorted_freq_keys) >= 25:
+            pool_15 = set(self.sorted_freq_keys[:15])
+            pool_16_20 = set(self.sorted_freq_keys[15:20])
+            pool_21_25 = set(self.sorted_freq_keys[20:25])
+            pool_rest = self.top_set - (pool_15 | pool_16_20 | pool_21_25)
+            if pool_15 and pool_16_20 and pool_21_25 and pool_rest:
+                self.strata = [sorted(pool_15), sorted(pool_16_20), sorted(pool_21_25), sorted(pool_rest)]
+
+        self._samplers = {}
+
+    def quadrant(self, n):
+        max_num = self.max_num
+        if n <= max_num // 4:
+            return 1
+        elif n <= max_num // 2:
+            return 2
+        elif n <= 3 * max_num // 4:
+            return 3
+        return 4
+
+    # --- Samplere ponderate, construite leneș și refolosite pe toată rularea ---
+    def sampler(self, key):
+        if key not in self._samplers:
+            self._samplers[key] = WeightedSampler(*self._sampler_weights(key))
+        return self._samplers[key]
+
+    def _sampler_weights(self, key):
+        top_nums = self.top_nums
+        if key == "frequency":
+            return top_nums, [self.frequency.get(n, 1) for n in top_nums]
+        if key == "average_sum":
+            target_sum = (self.max_num * self.variant_size) // 2
+            return top_nums, [1.0 / (1 + abs(n - target_sum / self.variant_size)) for n in top_nums]
+        if key == "history":
+            recent_rounds = self.historic_rounds[-self.history_depth:]
+            recent_freq = np.bincount(recent_rounds.ravel(), minlength=self.max_num + 1)
+            recent_freq[0] = 0  # pozițiile libere
+            pool_with_recent = [n for n in top_nums if recent_freq[n]]
+            return pool_with_recent, [int(recent_freq[n]) for n in pool_with_recent]
+        raise KeyError(key)
@@ -0,0 +1,126 @@
+import numpy as np
+
+from .parser import ROUND_CHUNK_ROWS, iter_round_chunks, round_coordinates
+
+
+# --- Co-apariții perechi/triplete prin produse de matrice (NumPy) ---
+#
+# X este matricea de incidență runde × max_number (X[r, n-1] = 1 dacă n a ieșit în
+# runda r). Perechile sunt X.T @ X, iar tripletele (i, j, l) sunt, pentru fiecare
+# i, produsul X_i.T @ X_i peste rundele care îl conțin pe i. Din matrice se extrag
+# doar primele top_k combinații (argpartition), fără sortarea tuturor.
+#
+# La egalitate de frecvență ordinea e cea a lui Counter.most_common pe runde: întâi
+# combinația apărută mai devreme (prima rundă care o conține), apoi, în aceeași rundă,
+# ordinea lexicografică. Prima apariție se caută doar pentru candidații rămași după top_k.
+
+# Peste acest domeniu tensorul dens de triplete (max_number^3) devine prea mare
+MAX_DENSE_TRIPLET_NUMBER = 160
+
+# Câte celule (runde × combinații căutate) verifică un pas din first_occurrence
+FIRST_SEEN_CELLS = 1 << 22
+
+
+def incidence_matrix(rounds, max_number, dtype=np.float32):
+    rows, cols = round_coordinates(rounds)
+    X = np.zeros((len(rounds), max_number), dtype=dtype)
+    X[rows, cols] = 1
+    return X
+
+
+def _count_dtype(num_rounds):
+    # float32 e exact pentru numere întregi sub 2^24 și mult mai rapid decât matmul pe int
+    return np.float32 if num_rounds < 2 ** 24 else np.float64
+
+
+def pair_matrix(X):
+    C = X.T @ X
+    np.fill_diagonal(C, 0)
+    return C
+
+
+def pair_counts(rounds, max_number):
+    # X.T @ X acumulat pe blocuri de rânduri: incidența densă există doar pentru blocul curent
+    dtype = _count_dtype(len(rounds))
+    C = np.zeros((max_number, max_number), dtype=dtype)
+    for _, block in iter_round_chunks(rounds):
+        X = incidence_matrix(block, max_number, dtype)
+        C += X.T @ X
+    np.fill_diagonal(C, 0)
+    return C
+
+
+def add_triplets(T, X):
+    # T[i] += X_i.T @ X_i pentru fiecare număr i prezent în X (T poate avea alt dtype, ex: int32)
+    for i in np.flatnonzero(X.any(axis=0)):
+        Xi = X[X[:, i] > 0]
+        T[i] += (Xi.T @ Xi).astype(T.dtype, copy=False)
+    return T
+
+
+def triplet_tensor(X):
+    M = X.shape[1]
+    return add_triplets(np.zeros((M, M, M), dtype=X.dtype), X)
+
+
+def first_occurrence(rounds, coords, max_number):
+    # indexul primei runde care conține toate numerele fiecărei combinații (coords: numere - 1)
+    first = np.full(len(coords), len(rounds), dtype=np.int64)
+    pending = np.arange(len(coords))
+    start = 0
+    while len(pending) and start < len(rounds):
+        block = rounds[start:start + min(ROUND_CHUNK_ROWS, max(1, FIRST_SEEN_CELLS // len(pending)))]
+        X = incidence_matrix(block, max_number, dtype=bool)
+        hit = X[:, coords[pending, 0]]
+        for c in range(1, coords.shape[1]):
+            hit &= X[:, coords[pending, c]]
+        found = hit.any(axis=0)
+        first[pending[found]] = start + hit[:, found].argmax(axis=0)
+        pending = pending[~found]
+        start += len(block)
+    return first
+
+
+def _top_entries(values, coords, top_k, rounds=None, max_number=None):
+    if top_k is not None and top_k < len(values):
+        keep = np.argpartition(-values, top_k - 1)[:top_k]
+        # păstrăm și egalitățile de la pragul top_k pentru o ordine deterministă
+        threshold = values[keep].min()
+        keep = np.flatnonzero(values >= threshold)
+        values, coords = values[keep], coords[keep]
+    keys = tuple(coords[:, c] for c in reversed(range(coords.shape[1])))
+    if rounds is not None:
+        keys += (first_occurrence(rounds, coords, max_number),)
+    order = np.lexsort(keys + (-values,))
+    if top_k is not None:
+        order = order[:top_k]
+    return {tuple(int(n) + 1 for n in coords[i]): int(values[i]) for i in order}
+
+
+def top_pairs(C, top_k=None, rounds=None):
+    # cu `rounds` (rundele din care provine C), egalitățile se ordonează după prima apariție
+    coords = np.argwhere(np.triu(C, k=1) > 0)
+    return _top_entries(C[coords[:, 0], coords[:, 1]], coords, top_k, rounds, C.shape[0])
+
+
+def top_triplets(T, top_k=None, rounds=None):
+    r = np.arange(T.shape[0])
+    upper = (r[:, None, None] < r[None, :, None]) & (r[None, :, None] < r[None, None, :])
+    coords = np.argwhere(upper & (T > 0))
+    return _top_entries(T[coords[:, 0], coords[:, 1], coords[:, 2]], coords, top_k, rounds, T.shape[0])
+
+
+def cooccurrence_counts(rounds, max_number, k_size, top_k=None):
+    # acumulat pe blocuri de runde: în memorie e doar incidența blocului curent
+    dtype = _count_dtype(len(rounds))
+    C = np.zeros((max_number, max_number), dtype=dtype)
+    T = np.zeros((max_number,) * 3, dtype=dtype) if k_size >= 3 else None
+    for _, block in iter_round_chunks(rounds):
+        X = incidence_matrix(block, max_number, dtype)
+        C += X.T @ X
+        if T is not None:
+            add_triplets(T, X)
+    np.fill_diagonal(C, 0)
+    pairs = top_pairs(C, top_k, rounds)
+    triplets = top_triplets(T, top_k, rounds) if T is not None else {}
+    return pairs, triplets
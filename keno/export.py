@@ -0,0 +1,90 @@
+import gzip
+import io
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # opțional: exportul .zst apare doar dacă pachetul e instalat
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # opțional: exportul Parquet apare doar dacă pachetul e instalat
+    pyarrow = None
+
+# Câte variante se formatează odată; doar un bloc de text e în memorie la un moment dat
+EXPORT_CHUNK_ROWS = 65536
+
+EXPORT_FORMATS = {
+    "txt": "Text (ID, numere)",
+    "txt.gz": "Text comprimat gzip",
+    "txt.zst": "Text comprimat zstd",
+    "npy": "NumPy binar (n × k, uint8/uint16)",
+    "parquet": "Parquet columnar",
+}
+
+
+def available_formats():
+    missing = set()
+    if zstandard is None:
+        missing.add("txt.zst")
+    if pyarrow is None:
+        missing.add("parquet")
+    return [fmt for fmt in EXPORT_FORMATS if fmt not in missing]
+
+
+def format_from_path(path):
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if str(path).endswith("." + fmt):
+            return fmt
+    return "txt"
+
+
+# --- Text, generat pe blocuri direct din matricea compactă de variante ---
+def iter_text_chunks(rows, with_id=True, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Același format ca format_export_lines ("ID, n1 n2 ..."), o linie per variantă
+    for start in range(0, len(rows), chunk_rows):
+        block = np.sort(rows[start:start + chunk_rows], axis=1).tolist()
+        if with_id:
+            lines = [f"{start + i + 1}, {' '.join(map(str, r))}" for i, r in enumerate(block)]
+        else:
+            lines = [" ".join(map(str, r)) for r in block]
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
+
+
+def _write_text(f, rows, with_id):
+    for chunk in iter_text_chunks(rows, with_id):
+        f.write(chunk)
+
+
+def write_export(f, rows, fmt="txt", with_id=True):
+    # Scrie exportul într-un fișier binar deschis, bloc cu bloc
+    rows = np.asarray(rows)
+    if fmt == "txt":
+        _write_text(f, rows, with_id)
+    elif fmt == "txt.gz":
+        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+            _write_text(gz, rows, with_id)
+    elif fmt == "txt.zst":
+        if zstandard is None:
+            raise ValueError("Exportul zstd necesită pachetul 'zstandard'.")
+        with zstandard.ZstdCompressor().stream_writer(f, closefd=False) as zst:
+            _write_text(zst, rows, with_id)
+    elif fmt == "npy":
+        np.save(f, np.ascontiguousarray(rows))
+    elif fmt == "parquet":
+        if pyarrow is None:
+            raise ValueError("Exportul Parquet necesită pachetul 'pyarrow'.")
+        table = pyarrow.table({f"n{j + 1}": rows[:, j] for j in range(rows.shape[1])})
+        pyarrow.parquet.write_table(table, f)
+    else:
+        raise ValueError(f"Format de export necunoscut: {fmt}")
+
+
+def export_bytes(rows, fmt="txt", with_id=True):
+    buffer = io.BytesIO()
+    write_export(buffer, rows, fmt, with_id)
+    return buffer.getvalue()
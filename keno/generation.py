@@ -0,0 +1,140 @@
+from math import comb
+import random
+import time
+
+import numpy as np
+
+from .scheduler import SCHEDULE_BLOCK
+from .strategies import generate_variant_by_strategy, is_valid_variant
+from .variants import VariantStore, binomial_table, unrank_rows
+
+# Peste acest raport (variante cerute / spațiu fezabil) bucla cu respingere intră într-o
+# coadă lungă de duplicate, deci se trece direct la extragerea de ranguri distincte
+EXHAUSTIVE_RATIO = 0.5
+
+# Strategii care ating uniform toate combinațiile k din Top N; celelalte fixează numere
+# (perechi, tripleți, pool-uri), deci spațiul lor real e doar o parte din C(n, k)
+UNIFORM_STRATEGIES = frozenset({"standard"})
+
+
+# --- Generare Logică Principală (fără Streamlit) ---
+def generate_variants(sctx, strategies_to_use, num_variants, on_progress=None, metrics=None, scheduler=None,
+                      cancel=None, variants=None):
+    started = time.perf_counter()
+    # variants: un VariantStore gol de completat (ex: citit parțial de GenerationJob)
+    if variants is None:
+        variants = VariantStore(sctx.max_num, sctx.variant_size)
+    num_generated = 0
+    max_attempts = num_variants * 100
+    attempts = 0
+
+    max_num = sctx.max_num
+    variant_size = sctx.variant_size
+    num_strategies = len(strategies_to_use)
+    schedule = []
+    block_attempts = np.zeros(num_strategies)
+    block_accepted = np.zeros(num_strategies)
+
+    while num_generated < num_variants and attempts < max_attempts:
+        # oprirea cerută din afară (ex: job în fundal) se verifică o dată per bloc
+        if cancel is not None and attempts % SCHEDULE_BLOCK == 0 and cancel.is_set():
+            break
+        if scheduler is None:
+            strategy_idx = (attempts + 1) % num_strategies
+        else:
+            # planificatorul împarte câte un bloc de încercări, reactualizat după randament
+            if not len(schedule):
+                if block_attempts.any():
+                    scheduler.update(block_attempts, block_accepted)
+                    block_attempts[:] = 0
+                    block_accepted[:] = 0
+                if scheduler.exhausted:
+                    break
+                schedule = scheduler.allocate(SCHEDULE_BLOCK).tolist()[::-1]
+            strategy_idx = schedule.pop()
+        attempts += 1
+
+        strategy_key = strategies_to_use[strategy_idx]
+
+        start = time.perf_counter() if metrics is not None else 0.0
+        variant = generate_variant_by_strategy(strategy_key, sctx)
+
+        outcome = "invalid"
+        if len(variant) == variant_size and is_valid_variant(variant, max_num):
+            outcome = "duplicates"
+            if variants.add(variant):
+                outcome = "accepted"
+                num_generated += 1
+
+                if on_progress is not None and num_generated % 50 == 0:
+                    on_progress(num_generated, attempts)
+        if metrics is not None:
+            metrics.count(strategy_key, time.perf_counter() - start, outcome)
+        if scheduler is not None:
+            block_attempts[strategy_idx] += 1
+            block_accepted[strategy_idx] += outcome == "accepted"
+
+    if metrics is not None:
+        metrics.wall_seconds += time.perf_counter() - started
+    return variants.shuffle(), attempts
+
+
+# --- Spațiul fezabil aproape epuizat: ranguri combinatorii distincte, fără respingere ---
+def feasible_pool(sctx, strategies_to_use):
+    # Toate strategiile completează din Top N; doar "cold_booster" aduce numere din afara lui
+    pool = set(sctx.top_nums)
+    if "cold_booster" in strategies_to_use:
+        pool.update(sctx.cold_candidates)
+    return sorted(pool)
+
+
+def feasible_space(sctx, strategies_to_use):
+    # Limită superioară; exactă doar când covers_feasible_space(strategies_to_use)
+    return comb(len(feasible_pool(sctx, strategies_to_use)), sctx.variant_size)
+
+
+def covers_feasible_space(strategies_to_use):
+    return bool(strategies_to_use) and set(strategies_to_use) <= UNIFORM_STRATEGIES
+
+
+def should_enumerate(sctx, strategies_to_use, num_variants):
+    # Extragerea de ranguri ar ignora strategiile, deci doar pentru strategii uniforme pe tot spațiul
+    return (covers_feasible_space(strategies_to_use)
+            and num_variants >= EXHAUSTIVE_RATIO * feasible_space(sctx, strategies_to_use))
+
+
+def generate_variants_exhaustive(sctx, strategies_to_use, num_variants, rng=None):
+    # Exact min(N, C(n, k)) variante unice în O(N): ranguri distincte, apoi unrank
+    pool = np.array(feasible_pool(sctx, strategies_to_use), dtype=np.int64)
+    variant_size = sctx.variant_size
+    total = comb(len(pool), variant_size)
+    num = min(num_variants, total)
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    ranks = np.arange(total) if num == total else rng.choice(total, num, replace=False)
+    rows = pool[unrank_rows(ranks, binomial_table(len(pool), variant_size)) - 1]
+    variants = VariantStore.from_rows(rows, sctx.max_num, variant_size)
+    return variants.shuffle(rng), num
+
+
+def scalar_candidates(sctx, strategies_to_use, attempt_ids, seconds=None, strategy_idx=None, rng=random):
+    # Echivalentul scalar al batch_candidates: o variantă per încercare, din rng (implicit modulul random)
+    variant_size = sctx.variant_size
+    if strategy_idx is None:
+        strategy_idx = attempt_ids % len(strategies_to_use)
+    rows = []
+    kept = []
+    for attempt, i in zip(attempt_ids.tolist(), strategy_idx.tolist()):
+        start = time.perf_counter() if seconds is not None else 0.0
+        variant = generate_variant_by_strategy(strategies_to_use[i], sctx, rng)
+        if seconds is not None:
+            seconds[i] += time.perf_counter() - start
+        if len(variant) == variant_size and is_valid_variant(variant, sctx.max_num):
+            rows.append(sorted(variant))
+            kept.append(attempt)
+    return np.array(rows, dtype=np.int64).reshape(-1, variant_size), np.array(kept, dtype=np.int64)
+
+
+def format_export_lines(variants, with_id=True):
+    for i, v in enumerate(variants):
+        variant_str_space = " ".join(map(str, sorted(v)))
+        yield f"{i+1}, {variant_str_space}" if with_id else variant_str_space
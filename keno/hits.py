@@ -0,0 +1,73 @@
+import numpy as np
+
+from .parser import as_rounds_array
+
+# Câte celule (variante × runde) procesează un bloc; blocurile mici rămân în cache-ul CPU
+HIT_BLOCK_CELLS = 1024 * 1024
+
+
+# --- Potriviri istorice bit-paralele ---
+#
+# Fiecare variantă și fiecare rundă devin o mască de biți împachetată în cuvinte
+# uint64 (ceil(max_number / 64) cuvinte). Numărul de potriviri variantă × rundă
+# este popcount(variantă & rundă), calculat pe blocuri de variante × runde, iar
+# din fiecare bloc se adună direct histograma potrivirilor per variantă.
+def pack_bitmasks(rows, max_number):
+    rows = as_rounds_array(rows, max_number)
+    words = -(-max_number // 64)
+    bits = np.zeros((len(rows), words * 64), dtype=bool)
+    r, c = np.nonzero(rows)
+    bits[r, rows[r, c].astype(np.int64) - 1] = True
+    return np.packbits(bits, axis=1, bitorder="little").view("<u8")
+
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    def popcount(x):
+        # SWAR pe uint64, pentru NumPy < 2.0
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def block_hits(variant_masks, round_masks):
+    # (v, W) & (r, W) -> (v, r) potriviri; temporarele se refolosesc între cuvinte
+    shape = (len(variant_masks), len(round_masks))
+    hits = np.zeros(shape, dtype=np.uint8)
+    both = np.empty(shape, dtype=np.uint64)
+    for w in range(variant_masks.shape[1]):
+        np.bitwise_and(variant_masks[:, None, w], round_masks[None, :, w], out=both)
+        hits += popcount(both).astype(np.uint8, copy=False)
+    return hits
+
+
+def history_hit_histograms(variant_rows, rounds, max_number, block_cells=HIT_BLOCK_CELLS, on_progress=None):
+    # Întoarce (n_variante, k + 1): de câte ori ar fi avut fiecare variantă 0, 1, ..., k potriviri în istoric
+    variant_rows = np.asarray(variant_rows)
+    k = variant_rows.shape[1]
+    variant_masks = pack_bitmasks(variant_rows, max_number)
+    round_masks = pack_bitmasks(rounds, max_number)
+    n_variants, n_rounds = len(variant_masks), len(round_masks)
+    histograms = np.zeros((n_variants, k + 1), dtype=np.int64)
+    if not n_variants or not n_rounds:
+        return histograms
+
+    round_block = min(n_rounds, max(1, block_cells // 256))
+    variant_block = max(1, block_cells // round_block)
+    for v0 in range(0, n_variants, variant_block):
+        v_masks = variant_masks[v0:v0 + variant_block]
+        block_hist = histograms[v0:v0 + len(v_masks)]
+        for r0 in range(0, n_rounds, round_block):
+            hits = block_hits(v_masks, round_masks[r0:r0 + round_block])
+            for h in range(k + 1):
+                block_hist[:, h] += np.count_nonzero(hits == h, axis=1)
+        if on_progress is not None:
+            on_progress(min(v0 + variant_block, n_variants), n_variants)
+    return histograms
+
+
+def rank_by_hits(histograms):
+    # Ordinea variantelor: întâi cele mai multe potriviri k/k, apoi (k-1)/k, ...
+    return np.lexsort(tuple(-histograms[:, h] for h in range(histograms.shape[1])))
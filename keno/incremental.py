@@ -0,0 +1,168 @@
+from collections import Counter
+import hashlib
+
+import numpy as np
+
+from .analysis import AnalysisContext, PAIR_TOP_K, add_combination_counts, frequency_from_counts, median_from_histogram
+from .cooccurrence import MAX_DENSE_TRIPLET_NUMBER, add_triplets, incidence_matrix, top_pairs, top_triplets
+from .parser import as_rounds_array, iter_round_chunks, parse_rounds_bytes, round_coordinates, rounds_dtype
+
+
+def _bytes_digest(data):
+    return hashlib.sha1(data).digest()
+
+
+# --- Analiză incrementală: agregatele se actualizează doar cu rundele noi ---
+#
+# Se păstrează frecvențele, matricea de perechi, tensorul de triplete, histograma
+# repetițiilor cu runda precedentă (pentru mediană) și indicii primei/ultimei
+# apariții. La un nou "Procesează", dacă conținutul vechi este un prefix neschimbat
+# al intrării (verificat prin hash pe bytes), se parsează și se procesează doar
+# sufixul nou în O(runde noi); altfel se reface analiza de la zero. Rundele stau
+# într-un buffer NumPy care crește geometric, iar context() întoarce o vedere; cu
+# attach_rounds() buffer-ul poate fi înlocuit de memmap-ul istoricului binar.
+#
+# Peste MAX_DENSE_TRIPLET_NUMBER tripletele nu mai au tensor dens: se țin într-un
+# Counter adus la zi leneș, în context(), doar cu rundele adăugate de la apelul
+# precedent (tot O(runde noi)) și doar dacă varianta cere triplete.
+class IncrementalAnalysis:
+    def __init__(self, max_number):
+        self.max_number = max_number
+        self.track_triplets = max_number <= MAX_DENSE_TRIPLET_NUMBER
+        self.reset()
+
+    def reset(self):
+        M = self.max_number
+        self._buffer = np.zeros((0, 0), dtype=rounds_dtype(M))
+        self.num_rounds = 0
+        self.num_numbers = 0
+        self.num_bytes = 0
+        self.bytes_digest = _bytes_digest(b"")
+        self.counts = np.zeros(M, dtype=np.int64)
+        self.first_seen = np.full(M, np.iinfo(np.int64).max, dtype=np.int64)
+        self.last_seen = np.full(M, -1, dtype=np.int64)
+        self.pairs = np.zeros((M, M), dtype=np.float64)
+        # contoare întregi (int32, exacte sub 2^31 runde): jumătate din memoria unui tensor float64
+        self.triplets = np.zeros((M, M, M), dtype=np.int32) if self.track_triplets else None
+        self.triplet_counts = Counter()
+        self._triplet_rounds = 0
+        self.rep_hist = np.zeros(1, dtype=np.int64)
+        self._last_row = None
+
+    @property
+    def rounds(self):
+        return self._buffer[:self.num_rounds]
+
+    def _is_extension(self, data):
+        n = self.num_bytes
+        if not n or len(data) < n or _bytes_digest(data[:n]) != self.bytes_digest:
+            return False
+        # ultima linie veche nu poate fi continuată (ex: "1,2" -> "1,2,3")
+        return data[n - 1:n] == b"\n" or data[n:n + 1] in (b"", b"\n", b"\r")
+
+    # --- Detectarea sufixului nou ---
+    def update_bytes(self, data):
+        # Întoarce (runde_noi, refacere_completă). Ridică RoundParseError fără a modifica starea.
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        n = self.num_bytes
+        if self._is_extension(data):
+            new_rounds = parse_rounds_bytes(data[n:], self.max_number, first_line=data.count(b"\n", 0, n) + 1)
+            full = False
+        else:
+            new_rounds = parse_rounds_bytes(data, self.max_number)
+            self.reset()
+            full = True
+        self.append_rounds(new_rounds)
+        self.num_bytes = len(data)
+        self.bytes_digest = _bytes_digest(data)
+        return len(new_rounds), full
+
+    def update_lines(self, lines):
+        return self.update_bytes("\n".join(lines))
+
+    def attach_rounds(self, rounds):
+        # Rundele deja analizate sunt înlocuite cu o copie identică din afara procesului
+        # (ex: memmap read-only); buffer-ul din memorie e eliberat, iar o extindere
+        # ulterioară realocă unul nou doar până la următorul attach_rounds
+        if len(rounds) != self.num_rounds:
+            raise ValueError(f"Istoricul atașat are {len(rounds)} runde, analiza {self.num_rounds}.")
+        self._buffer = rounds
+
+    def _grow(self, extra_rows, width):
+        needed = self.num_rounds + extra_rows
+        capacity, old_width = self._buffer.shape
+        if needed <= capacity and width <= old_width:
+            return
+        buffer = np.zeros((max(needed, 2 * capacity, 1024), max(width, old_width)), dtype=self._buffer.dtype)
+        buffer[:self.num_rounds, :old_width] = self.rounds
+        self._buffer = buffer
+
+    def append_rounds(self, new_rounds):
+        new_rounds = as_rounds_array(new_rounds, self.max_number)
+        if not len(new_rounds):
+            return
+        self._grow(len(new_rounds), new_rounds.shape[1])
+        # pe blocuri: incidența și coordonatele temporare sunt doar ale blocului curent
+        for _, block in iter_round_chunks(new_rounds):
+            self._append_block(block)
+
+    def _append_block(self, new_rounds):
+        start = self.num_rounds
+        rows, cols = round_coordinates(new_rounds)
+        rows = rows + start
+        X = incidence_matrix(new_rounds, self.max_number)
+
+        self.counts += np.bincount(cols, minlength=self.max_number)
+        # poziția globală a primei apariții (ordinea de inserție a unui Counter pe toate numerele)
+        np.minimum.at(self.first_seen, cols, self.num_numbers + np.arange(len(cols)))
+        np.maximum.at(self.last_seen, cols, rows)
+        self.num_numbers += len(cols)
+
+        self.pairs += X.T @ X
+        if self.track_triplets:
+            add_triplets(self.triplets, X)
+
+        # Repetiții cu runda precedentă (inclusiv legătura cu ultima rundă veche)
+        if self._last_row is None:
+            prev, nxt = X[:-1], X[1:]
+        else:
+            prev, nxt = np.vstack([self._last_row, X[:-1]]), X
+        reps = (prev * nxt).sum(axis=1).astype(np.int64)
+        if len(reps):
+            if reps.max() >= len(self.rep_hist):
+                self.rep_hist = np.concatenate([self.rep_hist, np.zeros(reps.max() + 1 - len(self.rep_hist), dtype=np.int64)])
+            self.rep_hist += np.bincount(reps, minlength=len(self.rep_hist))
+        self._last_row = X[-1:]
+
+        self._buffer[start:start + len(new_rounds), :new_rounds.shape[1]] = new_rounds
+        self.num_rounds += len(new_rounds)
+
+    # --- Rezultate ---
+    def frequency(self):
+        return frequency_from_counts(self.counts, self.first_seen)
+
+    def median_repetitions(self):
+        return median_from_histogram(self.rep_hist)
+
+    def context(self, variant_size, top_k=PAIR_TOP_K):
+        if not self.num_rounds:
+            return None
+        pair_frequency = top_pairs(self.pairs, top_k, self.rounds)
+        triplet_frequency = {}
+        if variant_size >= 3:
+            if self.track_triplets:
+                triplet_frequency = top_triplets(self.triplets, top_k, self.rounds)
+            else:
+                add_combination_counts(self.triplet_counts, self.rounds[self._triplet_rounds:], 3)
+                self._triplet_rounds = self.num_rounds
+                triplet_frequency = dict(self.triplet_counts.most_common(top_k))
+        return AnalysisContext(
+            max_number=self.max_number,
+            historic_rounds=self.rounds,
+            frequency=self.frequency(),
+            pair_frequency=pair_frequency,
+            triplet_frequency=triplet_frequency,
+            avg_reps=self.median_repetitions(),
+            last_seen=self.last_seen.copy(),
+        )
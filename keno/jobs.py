@@ -0,0 +1,94 @@
+import threading
+import time
+
+
+# --- Generare în fundal, cu progres și oprire la cerere ---
+#
+# Funcția de generare rulează într-un thread separat și primește on_progress(variante,
+# încercări) și evenimentul `cancel`. Buclele de generare verifică `cancel` o dată per
+# bloc și, la oprire, întorc normal variantele deja acceptate, deci rezultatul parțial
+# e utilizabil imediat. Obiectul se poate citi din alt thread (progresul e doar citit).
+#
+# Cu `variants` (VariantStore-ul completat de generare), partial() întoarce o copie a
+# variantelor acceptate până acum. Copia o face thread-ul generării, la următorul
+# on_progress, sub lacăt: store-ul nu se citește niciodată în timp ce e modificat.
+
+# Cât așteaptă partial() următorul punct de progres al generării
+PARTIAL_TIMEOUT = 2.0
+
+
+class GenerationJob:
+    def __init__(self, run, target, variants=None):
+        # run(on_progress, cancel) -> rezultatul generării
+        self.target = target
+        self.variants = variants
+        self.generated = 0
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_wanted = False
+        self._snapshot_ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(run,), name="keno-generation", daemon=True)
+        self._thread.start()
+
+    def _on_progress(self, generated, attempts):
+        self.generated = generated
+        self.attempts = attempts
+        if self._snapshot_wanted:
+            rows = self.variants.rows.copy()
+            with self._lock:
+                self._snapshot = rows
+                self._snapshot_wanted = False
+            self._snapshot_ready.set()
+
+    def _run(self, run):
+        try:
+            self.result = run(self._on_progress, self._cancel)
+        except Exception as e:  # eroarea se raportează în pagină, nu în thread
+            self.error = e
+        finally:
+            self.finished = time.perf_counter()
+
+    @property
+    def running(self):
+        return self.finished is None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def fraction(self):
+        return min(self.generated / self.target, 1.0) if self.target else 1.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def partial(self, timeout=PARTIAL_TIMEOUT):
+        # Copie (n, k) a variantelor acceptate până acum; None fără store sau dacă generarea
+        # n-a ajuns încă la un punct de progres. După final, store-ul nu mai e modificat.
+        if self.variants is None:
+            return None
+        if not self.running:
+            return self.variants.rows.copy()
+        with self._lock:
+            self._snapshot_ready.clear()
+            self._snapshot_wanted = True
+        self._snapshot_ready.wait(timeout)
+        if not self.running:
+            return self.variants.rows.copy()
+        with self._lock:
+            return self._snapshot
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self.running
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+
+import numpy as np
+
+# Câte funcții / locuri de alocare păstrează rapoartele de profilare
+PROFILE_TOP = 25
+
+
+@dataclass
+class StrategyMetrics:
+    seconds: float = 0.0
+    attempts: int = 0
+    accepted: int = 0
+    # variante complete, dar deja generate
+    duplicates: int = 0
+    # variante incomplete (strategia n-a găsit k numere) sau invalide
+    invalid: int = 0
+
+
+def block_counts(num_strategies, first_attempt, last_attempt, cand_attempts, fresh, strategy_idx=None):
+    # (încercări, complete, acceptate) per strategie pentru încercările first_attempt+1..last_attempt
+    # ale unui bloc; strategia unei încercări e rotația attempt % S sau strategy_idx[poziția în bloc]
+    def strategy_of(attempt_ids):
+        if strategy_idx is None:
+            return attempt_ids % num_strategies
+        return strategy_idx[attempt_ids - first_attempt - 1]
+
+    return tuple(
+        np.bincount(strategy_of(ids), minlength=num_strategies)
+        for ids in (np.arange(first_attempt + 1, last_attempt + 1), cand_attempts[cand_attempts <= last_attempt],
+                    cand_attempts[fresh])
+    )
+
+
+# --- Metrici de generare per strategie ---
+#
+# Bucla scalară numără fiecare încercare; buclele vectorizate (batch, paralel)
+# numără un bloc odată: încercările, variantele complete și cele acceptate ale
+# blocului sunt repartizate pe strategii la fel ca la generare (block_counts).
+# Încercările de după ultima variantă acceptată nu se numără.
+class GenerationMetrics:
+    def __init__(self, strategies_to_use):
+        self.strategies = list(strategies_to_use)
+        self.by_strategy = {key: StrategyMetrics() for key in self.strategies}
+        self.wall_seconds = 0.0
+
+    def count(self, strategy_key, seconds, outcome):
+        # outcome: "accepted", "duplicates" sau "invalid"
+        m = self.by_strategy[strategy_key]
+        m.seconds += seconds
+        m.attempts += 1
+        setattr(m, outcome, getattr(m, outcome) + 1)
+
+    def count_block(self, counts, seconds=None):
+        # counts: (încercări, complete, acceptate) per strategie, din block_counts
+        attempts, complete, accepted = counts
+        for i, key in enumerate(self.strategies):
+            m = self.by_strategy[key]
+            m.attempts += int(attempts[i])
+            m.accepted += int(accepted[i])
+            m.duplicates += int(complete[i] - accepted[i])
+            m.invalid += int(attempts[i] - complete[i])
+            if seconds is not None:
+                m.seconds += float(seconds[i])
+
+    def records(self):
+        rows = []
+        for key, m in self.by_strategy.items():
+            rows.append({
+                "strategy": key,
+                "seconds": m.seconds,
+                "attempts": m.attempts,
+                "accepted": m.accepted,
+                "duplicates": m.duplicates,
+                "invalid": m.invalid,
+                "yield": m.accepted / m.attempts if m.attempts else 0.0,
+                "accepted_per_second": m.accepted / m.seconds if m.seconds else 0.0,
+            })
+        return rows
+
+    def to_dict(self):
+        return {"wall_seconds": self.wall_seconds, "strategies": self.records()}
+
+
+# --- Profilare opțională a unei rulări (cProfile / tracemalloc) ---
+#
+# Doar procesul curent: în modul paralel, timpul petrecut în procesele worker
+# apare ca așteptare pe rezultate.
+#
+# cProfile și tracemalloc sunt globale per proces, iar job-urile din fundal ale mai
+# multor sesiuni rulează în același proces. O singură rulare profilează la un moment
+# dat; celelalte rulează normal, fără profil, cu `busy` setat.
+_PROFILE_LOCK = threading.Lock()
+
+
+class RunProfile:
+    def __init__(self, cpu=True, memory=False, top=PROFILE_TOP):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.cpu_report = ""
+        self.memory_report = ""
+        self.memory_peak = 0
+        self.busy = False
+        self._profiler = None
+        self._locked = False
+
+    def __enter__(self):
+        if not (self.cpu or self.memory):
+            return self
+        self._locked = _PROFILE_LOCK.acquire(blocking=False)
+        if not self._locked:
+            self.busy = True
+            return self
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if not self._locked:
+            return False
+        try:
+            self._collect()
+        finally:
+            self._locked = False
+            _PROFILE_LOCK.release()
+        return False
+
+    def _collect(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.memory:
+            # instantaneul se ia înainte de formatarea raportului CPU, ca să nu-l includă
+            snapshot = tracemalloc.take_snapshot()
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            lines = [f"Vârf memorie: {self.memory_peak / 1024 / 1024:.1f} MB"]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:self.top]]
+            self.memory_report = "\n".join(lines)
+        if self._profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+            self.cpu_report = out.getvalue()
+            self._profiler = None
@@ -0,0 +1,164 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from .batch import BatchGenerator, batch_candidates
+from .generation import scalar_candidates
+from .metrics import block_counts
+from .scheduler import SCHEDULE_LAG, schedule_sequence
+from .variants import VariantStore
+
+# Încercări per sarcină. Împărțirea e fixă (nu depinde de numărul de procese),
+# deci cu același seed rezultatul e identic pentru 1, 4 sau 32 de procese.
+TASK_ATTEMPTS = 16384
+
+# Procesele worker pornesc din forkserver (sau spawn), nu prin fork: procesul părinte
+# poate avea mai multe thread-uri (serverul Streamlit, job-uri în fundal)
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+# --- Generare paralelă pe mai multe procese ---
+#
+# Spațiul de încercări 1..max_attempts e tăiat în sarcini consecutive de câte
+# TASK_ATTEMPTS. Sarcina i are propriul RNG, derivat din seed-ul principal prin
+# SeedSequence(entropie, spawn_key=(i,)), și păstrează rotația strategiilor după
+# numărul global al încercării. Rezultatele sunt unite în ordinea sarcinilor, cu
+# deduplicare globală în VariantStore. Cu planificator adaptiv, sarcina t primește
+# alocarea calculată după sarcinile < t - SCHEDULE_LAG (cel mult SCHEDULE_LAG
+# sarcini în lucru), deci tot nu depinde de numărul de procese.
+class _TaskRunner:
+    # Starea unei rulări (context, strategii, generator batch): una per proces worker,
+    # sau una locală rulării în modul cu un singur proces, deci rulările nu se amestecă
+    def __init__(self, sctx, strategies_to_use, batch, timed=False):
+        self.sctx = sctx
+        self.strategies = strategies_to_use
+        self.generator = BatchGenerator(sctx) if batch else None
+        self.timed = timed
+
+    def __call__(self, first_attempt, size, seed_seq, strategy_idx=None):
+        # Întoarce (rânduri complete, încercările lor, timpul per strategie sau None)
+        attempt_ids = np.arange(first_attempt + 1, first_attempt + size + 1)
+        seconds = np.zeros(len(self.strategies)) if self.timed else None
+        if self.generator is not None:
+            rng = np.random.default_rng(seed_seq)
+            return (*batch_candidates(self.generator, self.strategies, attempt_ids, rng, seconds, strategy_idx), seconds)
+        # strategiile scalare primesc un random.Random propriu sarcinii, nu modulul global random
+        rng = random.Random(int(seed_seq.generate_state(1, np.uint64)[0]))
+        return (*scalar_candidates(self.sctx, self.strategies, attempt_ids, seconds, strategy_idx, rng), seconds)
+
+
+# Starea procesului worker (setată de inițializatorul pool-ului)
+_worker = None
+
+
+def _init_worker(sctx, strategies_to_use, batch, timed=False):
+    global _worker
+    _worker = _TaskRunner(sctx, strategies_to_use, batch, timed)
+
+
+def _run_task(first_attempt, size, seed_seq, strategy_idx=None):
+    return _worker(first_attempt, size, seed_seq, strategy_idx)
+
+
+class _InlineFuture:
+    def __init__(self, fn, *args):
+        self._result = fn(*args)
+
+    def result(self):
+        return self._result
+
+    def cancel(self):
+        return False
+
+
+def generate_variants_parallel(sctx, strategies_to_use, num_variants, on_progress=None, seed=None, workers=None,
+                               batch=True, task_attempts=TASK_ATTEMPTS, metrics=None, scheduler=None, cancel=None,
+                               variants=None):
+    started = time.perf_counter()
+    root = np.random.SeedSequence(seed)
+    workers = workers or os.cpu_count() or 1
+    max_attempts = num_variants * 100
+    attempts = 0
+    if variants is None:
+        variants = VariantStore(sctx.max_num, sctx.variant_size)
+
+    pool = None
+    runner = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context(POOL_START_METHOD),
+            initializer=_init_worker, initargs=(sctx, strategies_to_use, batch, metrics is not None),
+        )
+        lookahead = 2 * workers
+    else:
+        # aceleași sarcini, rulate pe rând în procesul curent
+        runner = _TaskRunner(sctx, strategies_to_use, batch, metrics is not None)
+        lookahead = 1
+    if scheduler is not None:
+        lookahead = min(lookahead, SCHEDULE_LAG)
+        weights_after = []  # ponderile planificatorului după fiecare sarcină consumată
+        initial_weights = scheduler.weights()
+
+    def task_weights(task):
+        if scheduler is None:
+            return None
+        return weights_after[task - SCHEDULE_LAG - 1] if task > SCHEDULE_LAG else initial_weights
+
+    def submit(task, weights):
+        first = task * task_attempts
+        size = min(task_attempts, max_attempts - first)
+        seed_seq = np.random.SeedSequence(root.entropy, spawn_key=(task,))
+        strategy_idx = schedule_sequence(weights, size) if weights is not None else None
+        if pool is None:
+            return _InlineFuture(runner, first, size, seed_seq, strategy_idx), strategy_idx
+        return pool.submit(_run_task, first, size, seed_seq, strategy_idx), strategy_idx
+
+    num_tasks = -(-max_attempts // task_attempts)
+    in_flight = deque()
+    next_task = 0
+    try:
+        while len(variants) < num_variants and (in_flight or next_task < num_tasks):
+            if cancel is not None and cancel.is_set():
+                break  # sarcinile în lucru sunt anulate mai jos
+            # câte 2 sarcini per proces în lucru, consumate strict în ordine
+            while next_task < num_tasks and len(in_flight) < lookahead:
+                weights = task_weights(next_task)
+                if weights is not None and not weights.any():
+                    num_tasks = next_task  # toate strategiile au fost retrase
+                    break
+                in_flight.append(submit(next_task, weights))
+                next_task += 1
+            if not in_flight:
+                break
+
+            future, strategy_idx = in_flight.popleft()
+            rows, cand_attempts, seconds = future.result()
+            remaining = num_variants - len(variants)
+            fresh = variants.add_rows(rows, limit=remaining)
+            first_attempt = (next_task - len(in_flight) - 1) * task_attempts
+            if len(fresh) == remaining:
+                attempts = int(cand_attempts[fresh[-1]])
+            else:
+                attempts = min((next_task - len(in_flight)) * task_attempts, max_attempts)
+            counts = block_counts(len(strategies_to_use), first_attempt, attempts, cand_attempts, fresh, strategy_idx)
+            if metrics is not None:
+                metrics.count_block(counts, seconds)
+            if scheduler is not None:
+                scheduler.update(counts[0], counts[2])
+                weights_after.append(scheduler.weights())
+            if on_progress is not None:
+                on_progress(len(variants), attempts)
+    finally:
+        for future, _ in in_flight:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if metrics is not None:
+        metrics.wall_seconds += time.perf_counter() - started
+    return variants.shuffle(np.random.default_rng(root)), attempts
@@ -0,0 +1,169 @@
+import numpy as np
+
+
+class RoundParseError(ValueError):
+    def __init__(self, message, line_numbers=()):
+        super().__init__(message)
+        self.line_numbers = list(line_numbers)
+
+
+# Câte linii greșite sunt enumerate explicit în mesajul de eroare
+MAX_REPORTED_LINES = 20
+
+# Mărimea unui bloc parsat odată (bytes); temporarele NumPy sunt ~8-16x mai mari
+CHUNK_BYTES = 1024 * 1024
+
+# Câte runde se procesează odată din istoric (ex: memmap-ul istoricului binar), ca
+# temporarele (coordonate int64, matrici de incidență) să rămână de ordinul MB
+ROUND_CHUNK_ROWS = 65536
+
+_DIGIT_POWERS = 10 ** np.arange(19, dtype=np.int64)
+
+
+def rounds_dtype(max_number):
+    return np.uint8 if max_number <= np.iinfo(np.uint8).max else np.uint16
+
+
+def as_rounds_array(rounds, max_number=None):
+    # Istoricul canonic: matrice runde × lățime, completată cu 0 pentru rundele mai scurte
+    if isinstance(rounds, np.ndarray):
+        return rounds
+    if max_number is None:
+        max_number = max((max(r) for r in rounds if len(r)), default=1)
+    width = max((len(r) for r in rounds), default=0)
+    arr = np.zeros((len(rounds), width), dtype=rounds_dtype(max_number))
+    for i, r in enumerate(rounds):
+        arr[i, :len(r)] = r
+    return arr
+
+
+def round_numbers(row):
+    row = np.asarray(row)
+    return row[row > 0]
+
+
+def round_coordinates(rounds):
+    # (indexul rundei, numărul - 1) pentru fiecare număr extras; acceptă liste sau matricea canonică
+    if isinstance(rounds, np.ndarray):
+        rows, cols = np.nonzero(rounds)
+        return rows, rounds[rows, cols].astype(np.int64) - 1
+    lengths = np.fromiter((len(r) for r in rounds), dtype=np.int64, count=len(rounds))
+    cols = np.fromiter((n for r in rounds for n in r), dtype=np.int64, count=int(lengths.sum())) - 1
+    return np.repeat(np.arange(len(rounds)), lengths), cols
+
+
+def iter_round_chunks(rounds, chunk_rows=ROUND_CHUNK_ROWS):
+    # (indexul primei runde, blocul de runde); pe un memmap se citește doar blocul curent
+    for start in range(0, len(rounds), chunk_rows):
+        yield start, rounds[start:start + chunk_rows]
+
+
+def _split_chunks(data, chunk_bytes):
+    start = 0
+    while start < len(data):
+        end = min(start + chunk_bytes, len(data))
+        if end < len(data):
+            nl = data.rfind(b"\n", start, end)
+            end = nl + 1 if nl >= start else data.find(b"\n", end) + 1 or len(data)
+        yield start, end
+        start = end
+
+
+def _parse_chunk(buf, max_number, first_line):
+    b = np.frombuffer(buf, dtype=np.uint8)
+    is_digit = (b - 48) < 10  # uint8: caracterele sub '0' dau overflow peste 10
+    is_nl = b == 10
+    is_comma = b == 44
+
+    # indexul liniei (în bloc) pentru fiecare caracter
+    line_of = np.cumsum(is_nl, dtype=np.int32)
+    line_of -= is_nl
+    num_lines = int(line_of[-1]) + 1 if len(b) else 0
+    bad = np.zeros(num_lines, dtype=bool)
+
+    # Caractere nepermise (litere, semne, puncte...) -> linia e invalidă
+    allowed = is_digit | is_nl | is_comma | (b == 32) | (b == 9) | (b == 13)
+    bad[line_of[~allowed]] = True
+
+    # Secvențe de cifre = numere
+    edges = np.diff(is_digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+
+    # Două numere în același câmp (ex: "1 2,3") -> invalid, ca int("1 2")
+    field_of = np.cumsum(is_comma | is_nl, dtype=np.int32)
+    field_at = field_of[starts]
+    same_field = np.flatnonzero(field_at[1:] == field_at[:-1]) + 1
+    bad[line_of[starts[same_field]]] = True
+
+    # Valoarea fiecărui număr, cifră cu cifră (numerele prea lungi sunt în afara domeniului)
+    too_long = lengths > 9
+    values = np.zeros(len(starts), dtype=np.int64)
+    last = len(b) - 1
+    for j in range(int(min(lengths.max(), 9)) if len(lengths) else 0):
+        digit = b[np.minimum(starts + j, last)].astype(np.int64) - 48
+        values = np.where(lengths > j, values * 10 + digit, values)
+    values[too_long] = max_number + 1
+
+    token_line = line_of[starts]
+    out_of_range = (values < 1) | (values > max_number)
+    bad[token_line[out_of_range]] = True
+
+    # Matricea runde × lățime (liniile fără numere sunt ignorate, ca liniile goale)
+    counts = np.bincount(token_line, minlength=num_lines)
+    has_numbers = counts > 0
+    width = int(counts.max()) if len(counts) else 0
+    line_start = np.cumsum(counts) - counts
+    col = np.arange(len(values)) - line_start[token_line]
+    rows = np.zeros((num_lines, width), dtype=np.int64)
+    rows[token_line, col] = values
+
+    # Numere duplicate în aceeași rundă
+    if width > 1:
+        sorted_rows = np.sort(rows, axis=1)
+        dup = ((np.diff(sorted_rows, axis=1) == 0) & (sorted_rows[:, 1:] > 0)).any(axis=1)
+        bad |= dup
+
+    keep = has_numbers & ~bad
+    bad_lines = np.flatnonzero(bad) + first_line
+    return rows[keep], bad_lines, num_lines
+
+
+def parse_rounds_bytes(data, max_number, chunk_bytes=CHUNK_BYTES, first_line=1):
+    # Parsare vectorizată a unui istoric CSV/TXT (o rundă pe linie, numere separate prin virgulă).
+    # Întoarce matricea runde × lățime (0 = poziție liberă); toate liniile greșite sunt
+    # raportate odată, printr-o singură RoundParseError.
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+
+    parts = []
+    bad_lines = []
+    line_offset = first_line
+    for start, end in _split_chunks(data, chunk_bytes):
+        rows, bad, consumed = _parse_chunk(data[start:end], max_number, line_offset)
+        parts.append(rows)
+        bad_lines.append(bad)
+        line_offset += consumed
+
+    bad_lines = np.concatenate(bad_lines) if bad_lines else np.zeros(0, dtype=np.int64)
+    if len(bad_lines):
+        shown = ", ".join(str(n) for n in bad_lines[:MAX_REPORTED_LINES])
+        more = f" (și încă {len(bad_lines) - MAX_REPORTED_LINES})" if len(bad_lines) > MAX_REPORTED_LINES else ""
+        raise RoundParseError(
+            f"Eroare: {len(bad_lines)} linii invalide (liniile {shown}{more}). Fiecare rundă trebuie să conțină "
+            f"doar numere întregi distincte între 1 și {max_number}, separate prin virgulă.",
+            bad_lines.tolist(),
+        )
+
+    width = max((p.shape[1] for p in parts), default=0)
+    total = sum(len(p) for p in parts)
+    rounds = np.zeros((total, width), dtype=rounds_dtype(max_number))
+    row = 0
+    for p in parts:
+        rounds[row:row + len(p), :p.shape[1]] = p
+        row += len(p)
+    return rounds
@@ -0,0 +1,93 @@
+import random
+
+
+# --- Eșantionare ponderată fără repetiție (arbore Fenwick peste ponderi) ---
+#
+# Ponderile sunt pregătite o singură dată; fiecare extragere coboară în arbore în
+# O(log n), iar numerele alese sunt scoase temporar (ponderea scăzută din arbore)
+# și puse la loc la finalul apelului, astfel încât același sampler poate fi
+# refolosit pentru toate încercările unei rulări.
+class WeightedSampler:
+    def __init__(self, population, weights):
+        self.population = list(population)
+        self.weights = [float(w) for w in weights]
+        self.index = {n: i for i, n in enumerate(self.population)}
+        self.size = len(self.population)
+        self.total = sum(self.weights)
+
+        tree = [0.0] * (self.size + 1)
+        for i, w in enumerate(self.weights, start=1):
+            tree[i] += w
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+        self.top_bit = 1
+        while self.top_bit * 2 <= self.size:
+            self.top_bit *= 2
+
+    def _remove(self, i, saved):
+        # nodurile atinse sunt salvate ca să fie restaurate exact, fără drift de rotunjire
+        w = self.weights[i]
+        i += 1
+        while i <= self.size:
+            if i not in saved:
+                saved[i] = self.tree[i]
+            self.tree[i] -= w
+            i += i & -i
+
+    def _find(self, u):
+        # cel mai mic index i cu suma prefixului > u
+        pos = 0
+        step = self.top_bit
+        tree = self.tree
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= u:
+                pos = nxt
+                u -= tree[nxt]
+            step //= 2
+        return pos
+
+    def sample(self, k, rng=random, exclude=()):
+        removed = [self.index[n] for n in exclude if n in self.index]
+        removed = list(dict.fromkeys(removed))
+        remaining_weight = self.total
+        saved = {}
+        for i in removed:
+            self._remove(i, saved)
+            remaining_weight -= self.weights[i]
+
+        sample = []
+        available = self.size - len(removed)
+        try:
+            for _ in range(k):
+                if available == 0:
+                    break
+                if remaining_weight <= 1e-12 * max(self.total, 1.0):
+                    taken = set(removed)
+                    rest = [self.population[i] for i in range(self.size) if i not in taken]
+                    sample.extend(rng.sample(rest, min(k - len(sample), len(rest))))
+                    break
+
+                i = self._find(rng.random() * remaining_weight)
+                if i >= self.size or self.weights[i] <= 0 or i in removed:
+                    # eroare de rotunjire la capătul arborelui: ultimul număr cu pondere rămasă
+                    taken = set(removed)
+                    i = max(j for j in range(self.size) if j not in taken and self.weights[j] > 0)
+
+                sample.append(self.population[i])
+                self._remove(i, saved)
+                remaining_weight -= self.weights[i]
+                removed.append(i)
+                available -= 1
+        finally:
+            for node, value in saved.items():
+                self.tree[node] = value
+
+        return sample
+
+
+def weighted_sample_unique(population, weights, k, rng=random):
+    return WeightedSampler(population, weights).sample(k, rng)
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Câte încercări planifică bucla scalară odată
+SCHEDULE_BLOCK = 256
+
+# Fereastra "recentă" a fiecărei strategii, în încercări: istoricul se stinge exponențial
+# după volumul de încercări, deci la fel pentru blocuri scalare mici și sarcini paralele mari
+SCHEDULE_WINDOW = 1024
+
+# O strategie e retrasă după cel puțin atâtea încercări recente cu randament sub RETIRE_RATE
+RETIRE_MIN_ATTEMPTS = 512
+RETIRE_RATE = 0.005
+
+# Randamentul minim folosit la alocare, ca strategiile slabe (dar neretrase) să fie încă explorate
+EXPLORE_FLOOR = 0.02
+
+# În modul paralel, sarcina t e planificată din rezultatele sarcinilor < t - SCHEDULE_LAG,
+# deci alocarea nu depinde de numărul de procese
+SCHEDULE_LAG = 8
+
+
+def schedule_sequence(weights, size):
+    # `size` indici de strategie, cu proporțiile din `weights`, intercalați uniform în bloc
+    weights = np.asarray(weights, dtype=np.float64)
+    if size <= 0 or weights.sum() <= 0:
+        return np.zeros(0, dtype=np.int64)
+    quotas = weights / weights.sum() * size
+    counts = np.floor(quotas).astype(np.int64)
+    # restul merge la cele mai mari fracții (la egalitate, strategia cu indice mai mic)
+    leftover = size - counts.sum()
+    counts[np.argsort(-(quotas - counts), kind="stable")[:leftover]] += 1
+    positions = np.concatenate([(np.arange(n) + 0.5) / n for n in counts if n])
+    strategy_idx = np.repeat(np.arange(len(counts)), counts)
+    return strategy_idx[np.argsort(positions, kind="stable")]
+
+
+# --- Planificator adaptiv al strategiilor ---
+#
+# În locul rotației fixe attempt % S, încercările fiecărui bloc sunt împărțite
+# proporțional cu proporția țintă a strategiei × randamentul ei recent (variante
+# noi acceptate / încercări, pe o fereastră exponențială de încercări). O
+# strategie care nu mai produce variante noi este retrasă; când toate sunt
+# retrase, generarea se oprește înainte de a epuiza max_attempts.
+class AdaptiveScheduler:
+    def __init__(self, strategies_to_use, targets=None):
+        self.strategies = list(strategies_to_use)
+        targets = targets or {}
+        shares = np.array([float(targets.get(key, 1.0)) for key in self.strategies])
+        self.targets = shares / shares.sum() if shares.sum() > 0 else np.zeros(len(shares))
+        self.recent_attempts = np.zeros(len(self.strategies))
+        self.recent_accepted = np.zeros(len(self.strategies))
+        # proporția 0 exclude strategia de la început (alegerea utilizatorului, nu retragere)
+        self.excluded = self.targets <= 0
+        self.retired = self.excluded.copy()
+
+    @property
+    def rates(self):
+        # randament recent, cu o încercare reușită "virtuală" ca punct de plecare optimist
+        return (self.recent_accepted + 1) / (self.recent_attempts + 1)
+
+    @property
+    def exhausted(self):
+        return bool(self.retired.all())
+
+    def weights(self):
+        weights = self.targets * np.maximum(self.rates, EXPLORE_FLOOR)
+        weights[self.retired] = 0.0
+        return weights
+
+    def allocate(self, size):
+        return schedule_sequence(self.weights(), size)
+
+    def update(self, attempts, accepted):
+        # attempts / accepted: numărate per strategie pe blocul tocmai încheiat
+        decay = np.exp(-np.asarray(attempts) / SCHEDULE_WINDOW)
+        self.recent_attempts = decay * self.recent_attempts + attempts
+        self.recent_accepted = decay * self.recent_accepted + accepted
+        self.retired |= (self.recent_attempts >= RETIRE_MIN_ATTEMPTS) & (self.rates < RETIRE_RATE)
+
+    def retired_strategies(self):
+        # doar strategiile retrase pe parcurs (fără variante noi), nu și cele excluse
+        return [key for key, retired in zip(self.strategies, self.retired & ~self.excluded) if retired]
+
+    def excluded_strategies(self):
+        return [key for key, excluded in zip(self.strategies, self.excluded) if excluded]
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .analysis import frequency_from_counts
+from .cooccurrence import pair_counts, top_pairs
+
+# Câte perechi din variantele generate se afișează/compară cu istoricul
+GENERATED_PAIRS_TOP_K = 15
+
+# Coloanele după care se pot filtra variantele (nume -> atribut / cadran)
+FILTER_FEATURES = ("sum", "evens", "range", "min", "max", "q1", "q2", "q3", "q4")
+
+
+def quadrant_edges(max_number):
+    return np.array([max_number // 4, max_number // 2, 3 * max_number // 4])
+
+
+def quadrant_of(numbers, max_number):
+    # 0..3 pentru Q1..Q4, aceleași limite ca StrategyContext.quadrant
+    return np.digitize(numbers, quadrant_edges(max_number), right=True)
+
+
+# --- Statisticile Secțiunii 4, calculate o singură dată per set de variante ---
+#
+# Totul pornește de la matricea (n, k) a variantelor sortate: frecvențe prin
+# bincount, sume/pare/range pe axa 1, cadrane prin np.digitize, perechi consecutive
+# prin np.diff și perechile cele mai frecvente din matricea de co-apariții X.T @ X,
+# acumulată pe blocuri de rânduri (fără incidența densă a tuturor variantelor).
+#
+# Aceleași coloane servesc filtrarea: pentru fiecare coloană filtrată se ține un
+# index sortat (argsort + valorile sortate), construit o singură dată. Un filtru
+# de interval devine două searchsorted; se pornește de la coloana cea mai
+# selectivă, iar celelalte condiții se verifică doar pe variantele rămase.
+@dataclass
+class VariantStats:
+    max_number: int
+    variant_size: int
+    count: int
+    # număr -> apariții, descrescător (la egalitate, ordinea primei apariții)
+    frequency: dict
+    sums: np.ndarray
+    evens: np.ndarray
+    ranges: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
+    quadrant_counts: np.ndarray
+    # (n, 4): câte numere din fiecare cadran are fiecare variantă
+    quadrants: np.ndarray
+    consecutive: np.ndarray
+    top_pairs: dict = field(default_factory=dict)
+    _indexes: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def top_numbers(self, n):
+        # Top N e doar o felie din clasamentul deja calculat
+        return list(self.frequency.items())[:n]
+
+    @property
+    def odds(self):
+        return self.variant_size - self.evens
+
+    def feature(self, name):
+        if name.startswith("q"):
+            return self.quadrants[:, int(name[1:]) - 1]
+        return {"sum": self.sums, "evens": self.evens, "range": self.ranges, "min": self.mins, "max": self.maxs}[name]
+
+    def sorted_index(self, name):
+        if name not in self._indexes:
+            column = self.feature(name)
+            order = np.argsort(column, kind="stable")
+            self._indexes[name] = (order, column[order])
+        return self._indexes[name]
+
+    def select(self, bounds):
+        # bounds: nume coloană -> (minim, maxim) inclusiv; întoarce indicii variantelor, în ordinea generării
+        spans = {}
+        for name, (lo, hi) in bounds.items():
+            _, values = self.sorted_index(name)
+            spans[name] = (np.searchsorted(values, lo, "left"), np.searchsorted(values, hi, "right"))
+        if not spans:
+            return np.arange(self.count)
+
+        best = min(spans, key=lambda name: spans[name][1] - spans[name][0])
+        start, stop = spans[best]
+        ids = np.sort(self.sorted_index(best)[0][start:stop])
+        for name, (lo, hi) in bounds.items():
+            if name != best and len(ids):
+                column = self.feature(name)[ids]
+                ids = ids[(column >= lo) & (column <= hi)]
+        return ids
+
+
+def compute_variant_stats(rows, max_number, pairs_top_k=GENERATED_PAIRS_TOP_K):
+    rows = np.sort(np.asarray(rows, dtype=np.int64), axis=1)
+    n, k = rows.shape
+    flat = rows.ravel() - 1
+    counts = np.bincount(flat, minlength=max_number)
+    first_seen = np.full(max_number, len(flat), dtype=np.int64)
+    np.minimum.at(first_seen, flat, np.arange(len(flat)))
+
+    quadrants = np.zeros((n, 4), dtype=np.int64)
+    if n and k:
+        cells = quadrant_of(rows, max_number) + 4 * np.arange(n)[:, None]
+        quadrants = np.bincount(cells.ravel(), minlength=4 * n).reshape(n, 4)
+
+    pairs = {}
+    if n and k >= 2:
+        pairs = top_pairs(pair_counts(rows, max_number), pairs_top_k, rows)
+
+    return VariantStats(
+        max_number=max_number,
+        variant_size=k,
+        count=n,
+        frequency=frequency_from_counts(counts, first_seen),
+        sums=rows.sum(axis=1),
+        evens=(rows % 2 == 0).sum(axis=1),
+        ranges=rows[:, -1] - rows[:, 0] if k else np.zeros(n, dtype=np.int64),
+        mins=rows[:, 0] if k else np.zeros(n, dtype=np.int64),
+        maxs=rows[:, -1] if k else np.zeros(n, dtype=np.int64),
+        quadrant_counts=quadrants.sum(axis=0),
+        quadrants=quadrants,
+        consecutive=(np.diff(rows, axis=1) == 1).any(axis=1),
+        top_pairs=pairs,
+    )
@@ -0,0 +1,90 @@
+import os
+import struct
+
+import numpy as np
+
+from .parser import as_rounds_array, rounds_dtype
+
+
+# --- Depozit binar de istoric, deschis prin mmap ---
+#
+# Fișierul are un antet fix (magic, versiune, max_number, lățime, număr de runde),
+# urmat de matricea runde × lățime (uint8 până la 255, altfel uint16, 0 = poziție
+# liberă). Matricea se deschide cu np.memmap, deci analizele rulează direct peste
+# paginile fișierului: nimic nu se copiază în memoria sesiunii, iar mai multe
+# sesiuni care deschid același istoric împart aceleași pagini din cache-ul OS.
+
+STORE_MAGIC = b"KENOHIST"
+STORE_VERSION = 1
+STORE_EXTENSION = ".khst"
+
+_HEADER = struct.Struct("<8sHHHxxQ")
+# datele încep aliniate la 32 de bytes
+HEADER_BYTES = 32
+
+
+class HistoryStoreError(ValueError):
+    pass
+
+
+def _pack_header(max_number, width, num_rounds):
+    return _HEADER.pack(STORE_MAGIC, STORE_VERSION, max_number, width, num_rounds).ljust(HEADER_BYTES, b"\0")
+
+
+def _read_header(f):
+    raw = f.read(HEADER_BYTES)
+    if len(raw) < HEADER_BYTES or not raw.startswith(STORE_MAGIC):
+        raise HistoryStoreError("Fișierul nu este un istoric binar Keno.")
+    _, version, max_number, width, num_rounds = _HEADER.unpack_from(raw)
+    if version != STORE_VERSION:
+        raise HistoryStoreError(f"Versiune necunoscută a istoricului binar: {version}.")
+    return max_number, width, num_rounds
+
+
+def is_history_store(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(STORE_MAGIC)) == STORE_MAGIC
+    except OSError:
+        return False
+
+
+def write_history(path, rounds, max_number):
+    rounds = as_rounds_array(rounds, max_number)
+    data = np.ascontiguousarray(rounds, dtype=rounds_dtype(max_number))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_pack_header(max_number, data.shape[1], data.shape[0]))
+        f.write(data.tobytes())
+    # scriere atomică: un cititor nu vede niciodată un fișier pe jumătate scris
+    os.replace(tmp_path, path)
+
+
+def append_history(path, rounds):
+    with open(path, "r+b") as f:
+        max_number, width, num_rounds = _read_header(f)
+        rounds = as_rounds_array(rounds, max_number)
+        if not len(rounds):
+            return num_rounds
+        if rounds.shape[1] > width:
+            raise HistoryStoreError(f"Rundele noi au {rounds.shape[1]} numere, istoricul permite maximum {width}.")
+        data = np.zeros((len(rounds), width), dtype=rounds_dtype(max_number))
+        data[:, :rounds.shape[1]] = rounds
+        f.seek(HEADER_BYTES + num_rounds * width * data.itemsize)
+        f.write(data.tobytes())
+        f.truncate()
+        # antetul se actualizează ultimul, după ce rundele sunt pe disc
+        f.seek(0)
+        f.write(_pack_header(max_number, width, num_rounds + len(rounds)))
+    return num_rounds + len(rounds)
+
+
+def open_history(path):
+    # Întoarce (runde, max_number); rundele sunt un np.memmap read-only (zero-copy)
+    with open(path, "rb") as f:
+        max_number, width, num_rounds = _read_header(f)
+    dtype = rounds_dtype(max_number)
+    if num_rounds == 0 or width == 0:
+        return np.zeros((num_rounds, width), dtype=dtype), max_number
+    rounds = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_BYTES, shape=(num_rounds, width))
+    return rounds, max_number
@@ -0,0 +1,197 @@
+import random
+
+
+ALL_STRATEGIES = {
+    "🎯 Standard (Aleatoriu Uniform)": "standard",
+    "🔥 Hot Numbers (3 din top 10 + rest ponderat)": "hot_numbers",
+    "❄️ Cold-Hot Hybrid (Mix 50/50 ponderat)": "cold_hot_hybrid",
+    "⚡ Frecvență Ponderată (Fără Repetiție)": "weighted_frequency",
+    "🥇 Perechi/Triplete de Aur (Bază Combinatorie + Rest din Top N)": "golden_pairs",
+    "🔄 Par-Impar Echilibrat (Generare Forțată)": "parity_balance",
+    "🗺️ Câmpuri de Forță (Minimum 3 Cadrane)": "quadrant_force",
+    "🕰️ Aproape de Întoarcere (Include numere 'în vârstă')": "return_age",
+    "⛓️ Numere Consecutive (Asigură o pereche)": "consecutive_pair",
+    "⭐ Frecvență & Vecinătate": "frequency_neighbors",
+    "💡 Restantierul (Cold Booster)": "cold_booster",
+    "⚖️ Somă Medie (Selecție Ponderată pe Suma Optimă)": "average_sum_weighted",
+    "🧬 Adâncimea Istoriei (Aderență la ultimele N runde)": "history_adherence",
+    "🧪 Mix Strategy (Combinație aleatorie a strategiilor)": "mix_strategy",
+    "🌡️ Termometrul (Hot/Cold Ratio 70/30)": "hot_cold_ratio",
+    "🧲 Atracția Vestică (Low Numbers Gravitation)": "low_numbers_gravitation",
+    "📅 Repetiție Zonală (Last Round Quadrant Mirroring)": "quadrant_mirroring",
+    "🔄 Aderență Forțată la Runda Precedentă (Repetiții Istorice)": "forced_repetitions",
+    "📈 Stratificată (Top 15/16-20/21-25 + Rest, doar pentru 4/4)": "stratified_mix",
+}
+
+MIX_STRATEGIES = ["hot_numbers", "cold_hot_hybrid", "weighted_frequency", "parity_balance"]
+
+
+def is_valid_variant(variant, max_num):
+    variant_set = set(variant)
+    if len(variant_set) != len(variant):
+        return False
+    return True
+
+
+def sample_excluding(pool, pool_set, m, taken, rng=random):
+    # Eșantion uniform de m numere din pool \ taken, fără a reconstrui pool-ul:
+    # primele m numere neluate dintr-o permutare aleatoare sunt uniforme.
+    if m <= 0 or not pool:
+        return []
+    overlap = sum(1 for n in taken if n in pool_set)
+    picks = rng.sample(pool, min(len(pool), m + overlap))
+    return [n for n in picks if n not in taken][:m]
+
+
+# --- Functie pentru generarea variantei pe baza strategiei (Logica Completa) ---
+def generate_variant_by_strategy(strategy_key, sctx, rng=random):
+    # rng: modulul random sau un random.Random propriu (rulări cu seed, izolate de restul procesului)
+    variant_size = sctx.variant_size
+    top_nums = sctx.top_nums
+    if len(top_nums) < variant_size:
+        return []
+
+    variant = []
+
+    # Strategy: Standard (Uniform Random)
+    if strategy_key == "standard":
+        variant = rng.sample(top_nums, variant_size)
+
+    # Strategy: Weighted Frequency
+    elif strategy_key == "weighted_frequency":
+        variant = sctx.sampler("frequency").sample(variant_size, rng)
+
+    # Strategy: Hot Numbers (3 from top 10 + rest weighted)
+    elif strategy_key == "hot_numbers":
+        hot_pool = sctx.hot10_pool
+        num_hot = min(3, variant_size, len(hot_pool))
+        variant.extend(rng.sample(hot_pool, num_hot))
+
+        remaining = variant_size - len(variant)
+        if remaining > 0:
+            variant.extend(sctx.sampler("frequency").sample(remaining, rng, exclude=variant))
+
+    # Strategy: Cold-Hot Hybrid
+    elif strategy_key == "cold_hot_hybrid":
+        num_hot = variant_size // 2
+        num_cold = variant_size - num_hot
+
+        if sctx.hot_pool:
+            variant.extend(rng.sample(sctx.hot_pool, min(num_hot, len(sctx.hot_pool))))
+        if sctx.cold_pool and num_cold > 0:
+            variant.extend(rng.sample(sctx.cold_pool, min(num_cold, len(sctx.cold_pool))))
+
+    # Strategy: Golden Pairs/Triplets
+    elif strategy_key == "golden_pairs":
+        variant.extend(sctx.base_combo)
+
+    # Strategy: Parity Balance
+    elif strategy_key == "parity_balance":
+        num_even = variant_size // 2
+        num_odd = variant_size - num_even
+
+        if sctx.even_pool:
+            variant.extend(rng.sample(sctx.even_pool, min(num_even, len(sctx.even_pool))))
+        if sctx.odd_pool:
+            variant.extend(rng.sample(sctx.odd_pool, min(num_odd, len(sctx.odd_pool))))
+
+    # Strategy: Quadrant Force
+    elif strategy_key == "quadrant_force":
+        quadrants = [q for q in sctx.quadrant_pools if q]
+        nums_per_quad = max(1, variant_size // len(quadrants)) if quadrants else 1
+
+        for q in quadrants:
+            if len(variant) < variant_size:
+                variant.extend(rng.sample(q, min(nums_per_quad, len(q), variant_size - len(variant))))
+
+    # Strategy: Return Age
+    elif strategy_key == "return_age":
+        if sctx.aged_pool:
+            num_aged = min(variant_size // 2, len(sctx.aged_pool))
+            variant.extend(rng.sample(sctx.aged_pool, num_aged))
+
+    # Strategy: Consecutive Pair
+    elif strategy_key == "consecutive_pair":
+        variant.extend(sctx.consecutive_base)
+
+    # Strategy: Frequency Neighbors
+    elif strategy_key == "frequency_neighbors":
+        if sctx.neighbor_seeds:
+            seed = rng.choice(sctx.neighbor_seeds)
+            variant.append(seed)
+
+            neighbors = sctx.neighbors[seed]
+            if neighbors:
+                num_neighbors = min(variant_size // 2, len(neighbors))
+                variant.extend(rng.sample(neighbors, num_neighbors))
+
+    # Strategy: Cold Booster
+    elif strategy_key == "cold_booster":
+        if sctx.cold_candidates:
+            num_cold = min(variant_size // 3, len(sctx.cold_candidates))
+            variant.extend(rng.sample(sctx.cold_candidates, num_cold))
+
+    # Strategy: Average Sum Weighted
+    elif strategy_key == "average_sum_weighted":
+        variant = sctx.sampler("average_sum").sample(variant_size, rng)
+
+    # Strategy: History Adherence
+    elif strategy_key == "history_adherence":
+        sampler = sctx.sampler("history")
+        if sampler.size:
+            variant = sampler.sample(min(variant_size, sampler.size), rng)
+
+    # Strategy: Mix Strategy
+    elif strategy_key == "mix_strategy":
+        chosen_strat = rng.choice(MIX_STRATEGIES)
+        return generate_variant_by_strategy(chosen_strat, sctx, rng)
+
+    # Strategy: Hot/Cold Ratio 70/30
+    elif strategy_key == "hot_cold_ratio":
+        num_hot = int(variant_size * 0.7)
+        num_cold = variant_size - num_hot
+
+        if sctx.hot_pool:
+            variant.extend(rng.sample(sctx.hot_pool, min(num_hot, len(sctx.hot_pool))))
+        if sctx.cold_pool and num_cold > 0:
+            variant.extend(rng.sample(sctx.cold_pool, min(num_cold, len(sctx.cold_pool))))
+
+    # Strategy: Low Numbers Gravitation
+    elif strategy_key == "low_numbers_gravitation":
+        if sctx.low_pool:
+            num_low = min(variant_size // 2, len(sctx.low_pool))
+            variant.extend(rng.sample(sctx.low_pool, num_low))
+
+    # Strategy: Quadrant Mirroring
+    elif strategy_key == "quadrant_mirroring":
+        for pool in sctx.mirror_pools:
+            if pool and len(variant) < variant_size:
+                variant.append(rng.choice(pool))
+
+    # Strategy: Forced Repetitions
+    elif strategy_key == "forced_repetitions":
+        if sctx.repeat_pool and sctx.avg_reps > 0:
+            num_repeat = min(sctx.avg_reps, len(sctx.repeat_pool), variant_size)
+            variant.extend(rng.sample(sctx.repeat_pool, num_repeat))
+
+    # Strategy: Stratified Mix (doar pentru 4/4)
+    elif strategy_key == "stratified_mix":
+        if sctx.strata is None:
+            variant = sctx.sampler("frequency").sample(variant_size, rng)
+        else:
+            variant = [rng.choice(pool) for pool in sctx.strata]
+
+    # Default fallback
+    else:
+        variant = rng.sample(top_nums, variant_size)
+
+    # Ensure unique and correct size (restul uniform din Top N)
+    taken = set(variant)
+    if len(taken) != len(variant):
+        variant = list(taken)
+    if len(variant) > variant_size:
+        variant = rng.sample(variant, variant_size)
+    elif len(variant) < variant_size:
+        variant.extend(sample_excluding(top_nums, sctx.top_set, variant_size - len(variant), taken, rng))
+
+    return variant
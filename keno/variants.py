@@ -0,0 +1,207 @@
+from functools import lru_cache
+from math import comb
+import random
+
+import numpy as np
+
+from .parser import rounds_dtype
+
+# Câte variante noi se țin într-un dict Python înainte de a fi scrise în matrice și index;
+# pragul crește cu indexul (1/PENDING_FLUSH_RATIO din el), deci interclasările costă liniar în total
+PENDING_FLUSH = 4096
+PENDING_FLUSH_RATIO = 64
+
+
+# --- Rangul combinatoriu (colex) al unei variante sortate ---
+#
+# Pentru numerele sortate c_1 < c_2 < ... < c_k (1-based), rangul este
+# sum C(c_i - 1, i). E o bijecție între variantele k din max_number și
+# 0 .. C(max_number, k) - 1, deci un singur int64 identifică varianta.
+@lru_cache(maxsize=32)
+def binomial_table(max_number, variant_size):
+    # tabel[n][j] = C(n, j); obiecte Python când rangurile nu încap în int64.
+    # Partajat între apeluri (cache), deci read-only.
+    fits = comb(max_number, variant_size) < 2 ** 63
+    table = np.array(
+        [[comb(n, j) for j in range(variant_size + 1)] for n in range(max_number + 1)],
+        dtype=np.int64 if fits else object,
+    )
+    table.flags.writeable = False
+    return table
+
+
+def rank_rows(rows, table):
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.arange(1, rows.shape[1] + 1)
+    return table[rows - 1, cols].sum(axis=1)
+
+
+def unrank_rows(ranks, table):
+    # Inversul lui rank_rows: pentru fiecare poziție i (de la k la 1) se alege cel mai
+    # mare c cu C(c, i) <= rest; coloanele tabelului sunt crescătoare, deci searchsorted.
+    ranks = np.asarray(ranks, dtype=table.dtype)
+    k = table.shape[1] - 1
+    rows = np.zeros((len(ranks), k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        column = table[:, i]
+        c = np.searchsorted(column, ranks, side="right") - 1
+        rows[:, i - 1] = c + 1
+        ranks = ranks - column[c]
+    return rows
+
+
+def valid_rows(rows, max_num):
+    # Echivalentul vectorizat al is_valid_variant (+ domeniul 1..max_num) pe rânduri sortate
+    rows = np.sort(np.asarray(rows), axis=1)
+    if rows.shape[1] == 0:
+        return np.ones(len(rows), dtype=bool)
+    distinct = (np.diff(rows, axis=1) > 0).all(axis=1)
+    return distinct & (rows[:, 0] >= 1) & (rows[:, -1] <= max_num)
+
+
+# --- Depozit compact de variante ---
+#
+# Variantele stau într-o matrice n × k (uint8/uint16, sortată pe rând) plus rangul
+# fiecăreia (int64). Deduplicarea folosește un index sortat de ranguri (căutare
+# binară) și un mic dict de variante încă nescrise, golit periodic în matrice și index.
+# Iterarea dă tuple sortate, ca lista de tuple folosită anterior.
+class VariantStore:
+    def __init__(self, max_number, variant_size, capacity=1024):
+        self.max_number = max_number
+        self.variant_size = variant_size
+        self._table = binomial_table(max_number, variant_size)
+        self._binom = self._table.tolist()
+        self._rows = np.zeros((capacity, variant_size), dtype=rounds_dtype(max_number))
+        self._keys = np.zeros(capacity, dtype=self._table.dtype)
+        self._size = 0
+        self._index = np.zeros(0, dtype=self._table.dtype)
+        self._pending = {}
+
+    @classmethod
+    def from_rows(cls, rows, max_number, variant_size=None):
+        rows = np.asarray(rows)
+        store = cls(max_number, rows.shape[1] if variant_size is None else variant_size, capacity=max(len(rows), 1))
+        store.add_rows(rows)
+        return store
+
+    def __len__(self):
+        return self._size + len(self._pending)
+
+    def __iter__(self):
+        return map(tuple, self.rows.tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [tuple(r) for r in self.rows[i].tolist()]
+        self._flush()
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return tuple(self._rows[i].tolist())
+
+    def __contains__(self, variant):
+        return self._has_key(self.key(sorted(variant)))
+
+    @property
+    def rows(self):
+        self._flush()
+        return self._rows[:self._size]
+
+    @property
+    def keys(self):
+        self._flush()
+        return self._keys[:self._size]
+
+    @property
+    def nbytes(self):
+        return self._rows.nbytes + self._keys.nbytes + self._index.nbytes
+
+    def key(self, sorted_variant):
+        binom = self._binom
+        return sum(binom[n - 1][i] for i, n in enumerate(sorted_variant, 1))
+
+    def _has_key(self, key):
+        if key in self._pending:
+            return True
+        index = self._index
+        i = index.searchsorted(key)
+        return i < len(index) and index[i] == key
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._rows):
+            return
+        capacity = max(needed, 2 * len(self._rows))
+        rows = np.zeros((capacity, self.variant_size), dtype=self._rows.dtype)
+        rows[:self._size] = self._rows[:self._size]
+        keys = np.zeros(capacity, dtype=self._keys.dtype)
+        keys[:self._size] = self._keys[:self._size]
+        self._rows, self._keys = rows, keys
+
+    def _flush(self):
+        if not self._pending:
+            return
+        n = len(self._pending)
+        self._reserve(n)
+        end = self._size + n
+        self._rows[self._size:end] = list(self._pending.values())
+        self._keys[self._size:end] = list(self._pending.keys())
+        self._merge_index(self._keys[self._size:end])
+        self._size = end
+        self._pending.clear()
+
+    def _merge_index(self, new_keys):
+        # doar cheile noi se sortează; se interclasează în indexul deja sortat
+        new_keys = np.sort(new_keys)
+        self._index = np.insert(self._index, self._index.searchsorted(new_keys), new_keys)
+
+    # --- Adăugare ---
+    def add(self, variant):
+        # Întoarce True dacă varianta (validă, în domeniu) este nouă
+        final_variant = sorted(variant)
+        k = self.variant_size
+        if len(final_variant) != k or len(set(final_variant)) != k:
+            return False
+        if final_variant[0] < 1 or final_variant[-1] > self.max_number:
+            return False
+        key = self.key(final_variant)
+        if self._has_key(key):
+            return False
+        self._pending[key] = final_variant
+        if len(self._pending) >= max(PENDING_FLUSH, len(self._index) // PENDING_FLUSH_RATIO):
+            self._flush()
+        return True
+
+    def add_rows(self, rows, limit=None):
+        # Adaugă rândurile valide și noi (în ordinea primei apariții); întoarce indicii lor în rows
+        rows = np.sort(np.asarray(rows), axis=1)
+        if not len(rows):
+            return np.zeros(0, dtype=np.int64)
+        candidates = np.flatnonzero(valid_rows(rows, self.max_number))
+        keys = rank_rows(rows[candidates], self._table)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        self._flush()
+        fresh = first[~np.isin(keys[first], self._index)]
+        if limit is not None:
+            fresh = fresh[:limit]
+
+        self._reserve(len(fresh))
+        end = self._size + len(fresh)
+        self._rows[self._size:end] = rows[candidates[fresh]]
+        self._keys[self._size:end] = keys[fresh]
+        self._size = end
+        self._merge_index(keys[fresh])
+        return candidates[fresh]
+
+    # --- Ordine ---
+    def shuffle(self, rng=None):
+        # Amestecă ordinea variantelor (indexul de deduplicare nu depinde de ordine)
+        self._flush()
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        perm = rng.permutation(self._size)
+        self._rows[:self._size] = self.rows[perm]
+        self._keys[:self._size] = self.keys[perm]
+        return self
@@ -0,0 +1,119 @@
+from itertools import combinations
+from math import comb
+import random
+
+import numpy as np
+
+from .variants import VariantStore, binomial_table, unrank_rows
+
+# Câte variante candidate se evaluează la fiecare pas greedy
+COVER_CANDIDATES = 512
+
+# Peste acest număr de t-subseturi vectorul de acoperire devine prea mare
+MAX_COVER_SUBSETS = 20_000_000
+
+
+# --- Sistem de acoperire (wheeling) t din k peste un pool ---
+#
+# Fiecare t-subset al pool-ului are un index (rangul colex) într-un vector de
+# contoare de acoperire. O variantă acoperă cele C(k, t) t-subseturi ale ei, deci
+# scorul unei candidate este câte din acestea au contorul 0 (o singură adunare
+# vectorizată pe indici). Pasul greedy: din COVER_CANDIDATES candidate, fiecare
+# construită în jurul unui t-subset încă neacoperit, se păstrează cea cu cel mai
+# mare câștig. La final, variantele redundante (toate t-subseturile acoperite de
+# cel puțin două ori) sunt eliminate.
+class CoveringDesign:
+    def __init__(self, pool_size, variant_size, t):
+        if not 1 <= t <= variant_size <= pool_size:
+            raise ValueError(f"Acoperirea cere 1 <= t ({t}) <= k ({variant_size}) <= mărimea pool-ului ({pool_size}).")
+        self.n = pool_size
+        self.k = variant_size
+        self.t = t
+        self.total = comb(pool_size, t)
+        if self.total > MAX_COVER_SUBSETS:
+            raise ValueError(f"Prea multe {t}-subseturi de acoperit ({self.total}); micșorați pool-ul sau t.")
+        self.table = binomial_table(pool_size, t)
+        self.subset_positions = np.array(list(combinations(range(variant_size), t)), dtype=np.int64)
+        self.counts = np.zeros(self.total, dtype=np.int32)
+        self.blocks = []
+        self.block_ranks = []
+        self.uncovered = self.total
+
+    def subset_ranks(self, blocks):
+        # blocks: (m, k) indici 0-based sortați în pool -> (m, C(k, t)) ranguri de t-subseturi
+        # rangul colex, pe coloane: sum_j C(b[p_j], j + 1), fără a materializa t-subseturile
+        ranks = np.zeros((len(blocks), len(self.subset_positions)), dtype=self.table.dtype)
+        for j in range(self.t):
+            ranks += self.table[:, j + 1][blocks[:, self.subset_positions[:, j]]]
+        return ranks
+
+    def gain(self, ranks):
+        return (self.counts[ranks] == 0).sum(axis=1)
+
+    def add(self, block, ranks):
+        self.uncovered -= int((self.counts[ranks] == 0).sum())
+        self.counts[ranks] += 1
+        self.blocks.append(block)
+        self.block_ranks.append(ranks)
+
+    def _candidates(self, rng, open_ranks, m):
+        # fiecare candidată pornește de la un t-subset neacoperit, completat aleator până la k
+        seeds = rng.choice(open_ranks, size=m)
+        seed_rows = unrank_rows(seeds, self.table) - 1
+        keys = rng.random((m, self.n))
+        np.put_along_axis(keys, seed_rows, 2.0, axis=1)
+        blocks = np.argpartition(-keys, self.k - 1, axis=1)[:, :self.k]
+        return np.sort(blocks, axis=1)
+
+    def build(self, max_blocks=None, rng=None, candidates=COVER_CANDIDATES, on_progress=None, cancel=None):
+        rng = np.random.default_rng(rng)
+        open_ranks = np.flatnonzero(self.counts == 0)
+        while self.uncovered and (max_blocks is None or len(self.blocks) < max_blocks):
+            if cancel is not None and cancel.is_set():
+                break
+            blocks = self._candidates(rng, open_ranks, candidates)
+            ranks = self.subset_ranks(blocks)
+            gains = self.gain(ranks)
+            best = int(np.argmax(gains))
+            self.add(blocks[best], ranks[best])
+            # lista t-subseturilor neacoperite (un supraset) se reface doar când
+            # cel puțin jumătate din ea a fost între timp acoperită
+            if self.uncovered and self.uncovered < len(open_ranks) // 2:
+                open_ranks = open_ranks[self.counts[open_ranks] == 0]
+            if on_progress is not None and len(self.blocks) % 50 == 0:
+                on_progress(len(self.blocks), self.coverage)
+        return self
+
+    def prune(self):
+        # căutare locală: se scot variantele ale căror t-subseturi sunt toate acoperite și de altele
+        kept_blocks = []
+        kept_ranks = []
+        for block, ranks in zip(reversed(self.blocks), reversed(self.block_ranks)):
+            if (self.counts[ranks] >= 2).all():
+                self.counts[ranks] -= 1
+            else:
+                kept_blocks.append(block)
+                kept_ranks.append(ranks)
+        self.blocks = kept_blocks[::-1]
+        self.block_ranks = kept_ranks[::-1]
+        return self
+
+    @property
+    def coverage(self):
+        return 1.0 - self.uncovered / self.total
+
+    def rows(self, pool):
+        pool = np.asarray(pool, dtype=np.int64)
+        if not self.blocks:
+            return np.zeros((0, self.k), dtype=np.int64)
+        return pool[np.array(self.blocks)]
+
+
+def generate_covering_variants(sctx, t, max_variants=None, rng=None, on_progress=None, cancel=None):
+    # Întoarce (variante, procentul de t-subseturi acoperite)
+    pool = sorted(sctx.top_nums)
+    design = CoveringDesign(len(pool), sctx.variant_size, t)
+    rng = np.random.default_rng(random.getrandbits(64) if rng is None else rng)
+    design.build(max_blocks=max_variants, rng=rng, on_progress=on_progress, cancel=cancel).prune()
+    variants = VariantStore.from_rows(design.rows(pool), sctx.max_num, sctx.variant_size)
+    return variants, design.coverage